@@ -1,10 +1,12 @@
 """
 AI API Endpoints - Provides AI-powered features for code analysis and feedback.
 """
+import json
 import logging
 import time
-from typing import Optional
+from typing import Optional, AsyncGenerator
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
@@ -123,6 +125,45 @@ async def explain_code(request: ExplainCodeRequest):
         )
 
 
+def _sse_response(chunks: AsyncGenerator[str, None]) -> StreamingResponse:
+    """Wrap text chunks as Server-Sent Events (start / chunk / done / error)."""
+    async def generate() -> AsyncGenerator[str, None]:
+        try:
+            yield f"data: {json.dumps({'type': 'start'})}\n\n"
+            async for chunk in chunks:
+                yield f"data: {json.dumps({'type': 'chunk', 'content': chunk})}\n\n"
+            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+        except Exception as e:
+            logger.error(f"AI stream failed: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.post("/explain-code-stream")
+async def explain_code_stream(request: ExplainCodeRequest):
+    """
+    Stream a code explanation as Server-Sent Events.
+
+    The first sentence reaches the student as soon as the model produces it
+    instead of after the full completion.
+    """
+    return _sse_response(ai_service.explain_code_stream(
+        code=request.code,
+        language=request.language,
+        detail_level=request.detail_level,
+        student_level=request.student_level
+    ))
+
+
 @router.post("/suggest-improvements", response_model=SuggestImprovementsResponse)
 async def suggest_improvements(request: SuggestImprovementsRequest):
     """
@@ -161,6 +202,18 @@ async def suggest_improvements(request: SuggestImprovementsRequest):
         )
 
 
+@router.post("/suggest-improvements-stream")
+async def suggest_improvements_stream(request: SuggestImprovementsRequest):
+    """Stream improvement suggestions as Server-Sent Events."""
+    return _sse_response(ai_service.suggest_improvements_stream(
+        code=request.code,
+        language=request.language,
+        focus_areas=request.focus_areas,
+        max_suggestions=request.max_suggestions,
+        include_refactored_code=request.include_refactored_code
+    ))
+
+
 @router.post("/answer-question", response_model=AnswerQuestionResponse)
 async def answer_question(request: AnswerQuestionRequest):
     """
@@ -199,6 +252,17 @@ async def answer_question(request: AnswerQuestionRequest):
         )
 
 
+@router.post("/answer-question-stream")
+async def answer_question_stream(request: AnswerQuestionRequest):
+    """Stream the answer to a student's question as Server-Sent Events."""
+    return _sse_response(ai_service.answer_student_question_stream(
+        question=request.question,
+        code=request.code,
+        language=request.language,
+        context=request.context
+    ))
+
+
 @router.get("/config", response_model=AIConfigResponse)
 async def get_ai_config():
     """
@@ -230,10 +294,11 @@ async def get_ai_stats():
     """
     Get AI service statistics.
 
-    Returns statistics about AI interactions including total count,
-    average latency, and breakdown by interaction type.
+    Returns statistics about the last 100 AI interactions including total
+    count, average latency, and breakdown by interaction type, taken across
+    all worker processes when Redis is configured.
     """
-    return ai_service.get_interaction_stats()
+    return await ai_service.get_shared_interaction_stats()
 
 
 @router.get("/health")
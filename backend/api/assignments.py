@@ -2,8 +2,10 @@
 Assignment Review Router - Handles assignment CRUD and automated grading endpoints
 """
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List, Dict
+from urllib.parse import quote
 import math
 
 from core.database import get_db
@@ -642,6 +644,27 @@ async def get_assignment_submissions(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/teacher/{assignment_id}/export")
+async def export_assignment_submissions(
+    assignment_id: str,
+    course_id: str = Query(..., description="课程ID")
+):
+    """
+    导出作业提交
+
+    以 ZIP 流的形式下载指定作业的全部提交文件。
+    """
+    # 课程/作业 ID 可能含非 latin-1 字符，文件名按 RFC 5987 编码
+    filename = quote(f"{course_id}_{assignment_id}_submissions.zip")
+    return StreamingResponse(
+        assignment_transfer_service.export_assignment_zip(assignment_id, course_id),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename=\"submissions.zip\"; filename*=UTF-8''{filename}"
+        }
+    )
+
+
 @router.post("/file-manager/sync", response_model=FileManagerSyncResponse)
 async def sync_with_file_manager(
     assignment_id: str = Form(..., description="作业ID"),
@@ -74,6 +74,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info(f"👋 Shutting down {settings.APP_NAME}")
+    from services.ai_service import ai_service
+    await ai_service.aclose()
     await async_engine.dispose()
 
 
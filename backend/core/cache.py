@@ -217,6 +217,7 @@ class CacheService:
     TTL_MEDIUM = 300  # 5 分钟
     TTL_LONG = 3600  # 1 小时
     TTL_SESSION = 86400  # 24 小时
+    TTL_WEEK = 604800  # 7 天
 
     def __init__(self):
         self._backend: Optional[CacheBackend] = None
@@ -298,6 +299,17 @@ class CacheService:
                 return await self._backend._client.delete(*keys)
         return 0
 
+    async def get_redis_client(self) -> Optional["redis.Redis"]:
+        """
+        获取底层 Redis 客户端（用于 Stream、Hash 等高级结构）
+
+        内存缓存后端时返回 None，调用方应自行降级
+        """
+        await self._ensure_initialized()
+        if isinstance(self._backend, RedisCache):
+            return self._backend._client
+        return None
+
     # ==================== 会话存储 ====================
 
     async def set_session(self, session_id: str, data: dict, ttl: int = TTL_SESSION) -> bool:
@@ -457,3 +469,7 @@ class CacheKeys:
     def user_session(user_id: Union[str, int]) -> str:
         return f"user:{user_id}"
 
+    @staticmethod
+    def llm_response(prompt_version: str, input_hash: str) -> str:
+        return f"llm:{prompt_version}:{input_hash}"
+
@@ -47,8 +47,24 @@ class Settings(BaseSettings):
     AI_TEMPERATURE: float = 0.7
     AI_MAX_TOKENS: int = 2000
     AI_TIMEOUT: int = 30
+    # Client-side token buckets for the OpenAI account limits (0 = unlimited)
+    OPENAI_MAX_REQUESTS_PER_MINUTE: int = 0
+    OPENAI_MAX_TOKENS_PER_MINUTE: int = 0
+    # Request token logprobs to score answer confidence; leave off for
+    # OpenAI-compatible backends and reasoning models that reject the parameter
+    OPENAI_LOGPROBS: bool = False
+    # In-flight request cap per OpenAI/FastChat provider (0 = unlimited)
+    AI_MAX_CONCURRENT_REQUESTS: int = 0
+    # Race categorize_question across every configured remote provider and
+    # keep the first answer (multiplies token spend for that call)
+    AI_RACE_PROVIDERS: bool = False
+    # Request explain_code's concepts and complexity sections as two extra
+    # concurrent completions (lower latency, three times the API calls)
+    AI_EXPLAIN_PARALLEL_SECTIONS: bool = False
     USE_LOCAL_LLM: bool = False
-    LOCAL_LLM_MODEL_PATH: str = ""
+    LOCAL_LLM_MODEL_PATH: str = ""  # GGUF file, Q4_K_M quantization recommended
+    LOCAL_LLM_N_CTX: int = 4096
+    LOCAL_LLM_GPU_LAYERS: int = 0  # -1 offloads every layer
 
     # FastChat Local Deployment Settings
     USE_FASTCHAT: bool = False
@@ -93,6 +109,10 @@ class Settings(BaseSettings):
         ".h", ".hpp",
         ".pdf", ".docx", ".txt"
     ]
+    # Background file-manager syncs allowed to run at once
+    FILE_SYNC_CONCURRENCY: int = 4
+    # Abandon a batch upload once more files than this fail validation (0 = never)
+    BATCH_UPLOAD_MAX_FAILURES: int = 0
 
     # Code Analysis Settings
     MAX_LINE_LENGTH: int = 120
@@ -1,7 +1,9 @@
 """
 FeedbackTemplate Model - Stores reusable feedback templates.
 """
+import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, List
 from enum import Enum as PyEnum
 
@@ -36,6 +38,31 @@ class TemplateTone(str, PyEnum):
     PROFESSIONAL = "professional"
 
 
+_PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+@lru_cache(maxsize=1024)
+def _split_placeholders(text: str) -> tuple[str, ...]:
+    """
+    Split a template string into alternating literal and placeholder-name parts.
+
+    Cached per distinct string, so each template is scanned once no matter how
+    often it is rendered. Odd indices of the result are placeholder names.
+    """
+    return tuple(_PLACEHOLDER_PATTERN.split(text))
+
+
+def _render_text(text: str, values: dict) -> str:
+    """Substitute known placeholders, leaving unknown ones untouched."""
+    parts = _split_placeholders(text)
+    if len(parts) == 1:
+        return text
+    return "".join(
+        part if i % 2 == 0 else (str(values[part]) if part in values else f"{{{part}}}")
+        for i, part in enumerate(parts)
+    )
+
+
 class FeedbackTemplate(Base, TimestampMixin):
     """
     FeedbackTemplate model for storing reusable feedback templates.
@@ -93,15 +120,7 @@ class FeedbackTemplate(Base, TimestampMixin):
         Returns:
             Tuple of (rendered_title, rendered_message)
         """
-        title = self.title
-        message = self.message
-        
-        for key, value in kwargs.items():
-            placeholder = f"{{{key}}}"
-            title = title.replace(placeholder, str(value))
-            message = message.replace(placeholder, str(value))
-        
-        return title, message
+        return _render_text(self.title, kwargs), _render_text(self.message, kwargs)
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
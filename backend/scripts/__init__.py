@@ -0,0 +1,2 @@
+# Maintenance Scripts Package
+
@@ -3,6 +3,7 @@
 Development helper script for AI Teaching Assistant Backend.
 Usage: python scripts/dev.py <command>
 """
+import importlib.util
 import subprocess
 import sys
 import os
@@ -66,10 +67,24 @@ def cmd_install():
     run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
 
 
+# Development tools: pip distribution name -> importable module name
+DEV_PACKAGES = {
+    "black": "black",
+    "isort": "isort",
+    "mypy": "mypy",
+    "ruff": "ruff",
+    "pytest-cov": "pytest_cov",
+}
+
+
 def cmd_install_dev():
     """Install development dependencies."""
     run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-    run_command([sys.executable, "-m", "pip", "install", "black", "isort", "mypy", "ruff", "pytest-cov"])
+    missing = [pkg for pkg, module in DEV_PACKAGES.items() if importlib.util.find_spec(module) is None]
+    if not missing:
+        print("Development tools already installed.")
+        return
+    run_command([sys.executable, "-m", "pip", "install", *missing])
 
 
 def cmd_clean():
@@ -0,0 +1,73 @@
+"""
+Sample data for the database seeding script.
+
+Kept in an importable module (rather than inline in ``seed_database``) so the
+literals are compiled once into a cached ``.pyc`` instead of being re-parsed
+every time the seeding script is launched as ``__main__``.
+"""
+from datetime import datetime, timedelta, timezone
+
+from models.assignment import AssignmentType
+from models.submission import SubmissionStatus
+
+SAMPLE_STUDENTS = [
+    {"student_id": "STU001", "name": "Alice Johnson", "email": "alice@university.edu", "course_id": "CS101"},
+    {"student_id": "STU002", "name": "Bob Smith", "email": "bob@university.edu", "course_id": "CS101"},
+    {"student_id": "STU003", "name": "Carol Williams", "email": "carol@university.edu", "course_id": "CS101"},
+    {"student_id": "STU004", "name": "David Brown", "email": "david@university.edu", "course_id": "CS102"},
+    {"student_id": "STU005", "name": "Eve Davis", "email": "eve@university.edu", "course_id": "CS102"},
+]
+
+SAMPLE_ASSIGNMENTS = [
+    {
+        "assignment_id": "ASN001",
+        "title": "Python Basics",
+        "description": "Write a Python program that demonstrates basic syntax and data types.",
+        "assignment_type": AssignmentType.CODE,
+        "course_id": "CS101",
+        "max_score": 100.0,
+        "due_date": datetime.now(timezone.utc) + timedelta(days=7),
+    },
+    {
+        "assignment_id": "ASN002",
+        "title": "Data Structures Essay",
+        "description": "Write an essay comparing different data structures and their use cases.",
+        "assignment_type": AssignmentType.ESSAY,
+        "course_id": "CS101",
+        "max_score": 50.0,
+        "due_date": datetime.now(timezone.utc) + timedelta(days=14),
+    },
+    {
+        "assignment_id": "ASN003",
+        "title": "Algorithm Quiz",
+        "description": "Multiple choice quiz on sorting and searching algorithms.",
+        "assignment_type": AssignmentType.QUIZ,
+        "course_id": "CS102",
+        "max_score": 25.0,
+        "due_date": datetime.now(timezone.utc) + timedelta(days=3),
+    },
+]
+
+SAMPLE_SUBMISSIONS = [
+    {
+        "submission_id": "SUB001",
+        "student_idx": 0,  # Alice
+        "assignment_idx": 0,  # Python Basics
+        "content": 'def hello():\n    print("Hello, World!")\n\nhello()',
+        "status": SubmissionStatus.GRADED,
+    },
+    {
+        "submission_id": "SUB002",
+        "student_idx": 1,  # Bob
+        "assignment_idx": 0,  # Python Basics
+        "content": 'x = 10\ny = 20\nprint(f"Sum: {x + y}")',
+        "status": SubmissionStatus.PENDING,
+    },
+    {
+        "submission_id": "SUB003",
+        "student_idx": 0,  # Alice
+        "assignment_idx": 1,  # Essay
+        "content": "Data structures are fundamental to computer science...",
+        "status": SubmissionStatus.PENDING,
+    },
+]
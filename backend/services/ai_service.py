@@ -2,19 +2,329 @@
 AI Service - Handles AI/LLM integration for grading and Q&A
 Supports OpenAI API and local LLM models
 """
+import os
+import re
+import math
 import time
+import hashlib
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List
+import functools
+import traceback
+import contextlib
+from collections import Counter, OrderedDict, defaultdict, deque
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable, Deque, Type
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
 
-from openai import AsyncOpenAI
+import httpx
+import openai
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from core.config import settings
+from core.cache import cache_service, CacheKeys, CacheService
+
+try:
+    from openai import DefaultAioHttpClient
+except ImportError:
+    DefaultAioHttpClient = None
+
+try:
+    from llama_cpp import Llama, LlamaRAMCache
+except ImportError:
+    Llama = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+try:
+    import h2
+except ImportError:
+    h2 = None
 
 logger = logging.getLogger(__name__)
 
+# Connection pool sized for many students submitting at once
+HTTP_CONNECTION_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=1000)
+
+# Bump to invalidate cached LLM responses after prompt or rubric changes
+PROMPT_VERSION = "v2"
+# Providers report failures as text; never cache these
+_ERROR_RESPONSE_PREFIXES = (
+    "AI service error", "AI service not configured", "Local LLM not configured",
+    "FastChat服务错误", "DeepSeek服务",
+)
+
+# Response parsing patterns, compiled once instead of per call / per line
+_CONCEPT_PATTERN = re.compile(r"concept|principle|pattern|technique|method", re.IGNORECASE)
+_UNCERTAIN_PATTERN = re.compile(r"\b(?:not sure|might be)\b", re.IGNORECASE)
+_CODE_BLOCK_PATTERN = re.compile(r"```[\w]*\n(.*?)```", re.DOTALL)
+_SUGGESTION_PREFIXES = ("1.", "2.", "3.", "4.", "5.", "-", "*")
+_FOLLOW_UP_RULES = (
+    (re.compile(r"how", re.IGNORECASE), "What are the alternatives to this approach?"),
+    (re.compile(r"why", re.IGNORECASE), "What would happen if we did it differently?"),
+    (re.compile(r"error|bug", re.IGNORECASE), "How can I prevent this issue in the future?"),
+    (re.compile(r"function|method", re.IGNORECASE), "How can I test this function effectively?"),
+)
+# Canned answers for LocalLLMProvider.answer_question, in priority order
+_LOCAL_ANSWERS = {
+    "recursion": "Recursion is when a function calls itself with a base case.",
+    "loop": "Loops repeat code. Use 'for' for known iterations, 'while' for conditions.",
+    "function": "Functions are reusable code blocks defined with 'def'.",
+}
+_LOCAL_ANSWER_KEYWORDS = frozenset(_LOCAL_ANSWERS)
+_WORD_PATTERN = re.compile(r"\w+")
+# Keywords for LocalLLMProvider.categorize_question, highest priority first,
+# combined into one alternation so the question is scanned once
+_LOCAL_CATEGORY_KEYWORDS = {
+    "administrative": ("deadline", "grade", "submit"),
+    "advanced": ("optimize", "design", "scale"),
+    "basic": ("what is", "define"),
+}
+_LOCAL_CATEGORY_PATTERN = re.compile(
+    "|".join(
+        f"(?P<{category}>{'|'.join(map(re.escape, keywords))})"
+        for category, keywords in _LOCAL_CATEGORY_KEYWORDS.items()
+    ),
+    re.IGNORECASE
+)
+_LOCAL_TOP_CATEGORY = next(iter(_LOCAL_CATEGORY_KEYWORDS))
+
+# Labels the categorize prompts ask the model for
+_VALID_CATEGORIES = frozenset({"basic", "intermediate", "advanced", "administrative"})
+# Category reported when neither keywords nor the model give a usable label
+_FALLBACK_CATEGORY = "intermediate"
+# Keyword fallbacks for the Chinese-language providers, checked in order
+_ZH_CATEGORY_PATTERNS = (
+    ("basic", re.compile("什么是|定义|基础|入门")),
+    ("administrative", re.compile("截止|成绩|提交|分数")),
+    ("advanced", re.compile("优化|架构|设计|性能")),
+)
+_ZH_UNCERTAIN_PATTERN = re.compile("不确定|可能|也许|不太清楚|需要确认")
+
+
+# System prompts of the Chinese-language providers. They never contain request
+# data, so every call shares the same prefix and hits the server's prompt cache.
+_ZH_FEEDBACK_SYSTEM_PROMPT = """你是一位经验丰富的编程教学助手。请用中文提供代码反馈。
+要求：
+1. 语言友好、鼓励性强，但要诚实指出问题
+2. 适合中国学生的学习习惯
+3. 提供具体的改进建议和示例"""
+_ZH_ANSWER_SYSTEM_PROMPT = """你是一位专业的编程教学助手。请用中文回答学生的问题。
+要求：
+1. 回答清晰、准确、易于理解
+2. 适合中国学生的认知水平
+3. 提供实际的代码示例
+4. 鼓励学生深入思考"""
+
+# User prompt of the Chinese-language providers' generate_code_feedback
+_ZH_FEEDBACK_TEMPLATE = """请分析以下代码并提供反馈：
+
+```python
+{code}
+```
+
+代码分析结果：
+- 代码风格评分: {style_score}
+- 复杂度: {complexity}
+- 发现的问题:
+{issues}
+
+请提供：
+1. 代码的优点（做得好的地方）
+2. 需要改进的地方
+3. 具体的改进建议（包括代码示例）
+4. 学习建议（推荐的学习资源或概念）"""
+
+
+def _zh_code_feedback_prompt(code: str, analysis_results: Dict[str, Any]) -> str:
+    issues = analysis_results.get("issues", [])
+    return _ZH_FEEDBACK_TEMPLATE.format(
+        code=code,
+        style_score=analysis_results.get("style_score", "N/A"),
+        complexity=analysis_results.get("complexity", "N/A"),
+        issues="\n".join(f"- {issue}" for issue in issues) if issues else "无明显问题"
+    )
+
+
+def _zh_answer_prompt(question: str, context: str = "") -> str:
+    prompt = f"学生问题: {question}\n"
+    if context:
+        prompt += f"\n相关背景: {context}\n"
+    prompt += "\n请提供详细的回答，包括概念解释和代码示例（如果适用）。"
+    return prompt
+
+
+def _en_keyword_category(question: str) -> Optional[str]:
+    """Category of an English question by keyword, or None when no keyword matches."""
+    found = set()
+    for match in _LOCAL_CATEGORY_PATTERN.finditer(question):
+        if match.lastgroup == _LOCAL_TOP_CATEGORY:
+            return match.lastgroup
+        found.add(match.lastgroup)
+    return next((c for c in _LOCAL_CATEGORY_KEYWORDS if c in found), None)
+
+
+def _zh_keyword_category(question: str) -> Optional[str]:
+    """Category of a Chinese question by keyword, or None when no keyword matches."""
+    for category, pattern in _ZH_CATEGORY_PATTERNS:
+        if pattern.search(question):
+            return category
+    return None
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    """
+    aiohttp-backed transport when openai[aiohttp] is installed, else httpx.
+
+    Both use HTTP_CONNECTION_LIMITS instead of the SDK's 100-connection
+    default; the httpx fallback negotiates HTTP/2 when h2 is installed.
+    """
+    if DefaultAioHttpClient is not None:
+        try:
+            return DefaultAioHttpClient(limits=HTTP_CONNECTION_LIMITS)
+        except RuntimeError:
+            # openai is installed without the aiohttp extra
+            pass
+    return DefaultAsyncHttpxClient(limits=HTTP_CONNECTION_LIMITS, http2=h2 is not None)
+
+
+# One AsyncOpenAI client per (api_key, base_url, timeout), shared by every
+# provider instance so they reuse one connection pool and its TLS sessions
+_shared_clients: Dict[Tuple[str, str, Optional[float]], AsyncOpenAI] = {}
+
+
+def _get_async_client(api_key: str, base_url: str, timeout: Optional[float] = None) -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client for this endpoint, creating it on first use."""
+    key = (api_key, base_url, timeout)
+    client = _shared_clients.get(key)
+    if client is None:
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=_build_http_client(),
+            **kwargs
+        )
+        _shared_clients[key] = client
+    return client
+
+
+async def close_shared_clients() -> None:
+    """Close every shared AsyncOpenAI client (application shutdown)."""
+    clients = list(_shared_clients.values())
+    _shared_clients.clear()
+    for client in clients:
+        await client.close()
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """tiktoken encoding for a model, or None when unavailable (not installed / offline)."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Non-OpenAI model name (e.g. served behind a compatible API)
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Exact prompt token count with tiktoken, falling back to ~4 chars per token."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class TokenBucket:
+    """
+    Async token bucket allowing ``capacity`` units per ``period`` seconds.
+
+    Callers wait (in FIFO order) until enough capacity has refilled instead of
+    hitting the provider's limit and getting a 429.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._available = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A single request larger than the bucket can never fit; cap it
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._available >= amount:
+                    self._available -= amount
+                    return
+                await asyncio.sleep((amount - self._available) / self.rate)
+
+
+def _request_slots(limit: int):
+    """Async context manager capping in-flight provider requests (limit <= 0: no cap)."""
+    return asyncio.Semaphore(limit) if limit > 0 else contextlib.nullcontext()
+
+
+# Outage-type failures that count towards opening a CircuitBreaker; client
+# errors such as an over-long prompt say nothing about provider health
+_BREAKER_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a provider is down instead of paying its full timeout.
+
+    After failure_threshold consecutive failures the breaker opens and
+    allow() rejects calls for recovery_timeout seconds. It then admits a
+    single probe (re-arming the timer for everyone else); the probe's
+    outcome closes the breaker or keeps it open for another window.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.recovery_timeout:
+            return False
+        self.opened_at = now
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
 
 class AIProvider(str, Enum):
     OPENAI = "openai"
@@ -24,7 +334,7 @@ class AIProvider(str, Enum):
     DEEPSEEK = "deepseek"
 
 
-@dataclass
+@dataclass(slots=True)
 class AIConfig:
     provider: AIProvider = AIProvider.OPENAI
     model: str = "gpt-4"
@@ -34,6 +344,14 @@ class AIConfig:
 
 
 class BaseAIProvider(ABC):
+    def request_settings(self, **kwargs) -> Tuple[str, float, int]:
+        """(model, temperature, max_tokens) that generate_response(**kwargs) would use."""
+        return (
+            kwargs.get("model", self.config.model),
+            kwargs.get("temperature", self.config.temperature),
+            kwargs.get("max_tokens", self.config.max_tokens),
+        )
+
     @abstractmethod
     async def generate_response(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
         pass
@@ -47,73 +365,280 @@ class BaseAIProvider(ABC):
         pass
     
     @abstractmethod
-    async def categorize_question(self, question: str) -> str:
+    async def classify_question(self, question: str) -> Optional[str]:
+        """Return the question's category, or None when no usable label was produced."""
         pass
 
+    async def categorize_question(self, question: str) -> str:
+        return await self.classify_question(question) or _FALLBACK_CATEGORY
+
 
 class OpenAIProvider(BaseAIProvider):
+    _NOT_CONFIGURED = "AI service not configured. Set OPENAI_API_KEY."
+    _UNAVAILABLE = "AI service error: provider unavailable, retry later"
+
     def __init__(self, config: AIConfig):
         self.config = config
         api_key = config.api_key or settings.OPENAI_API_KEY
         base_url = settings.OPENAI_API_BASE
-        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url) if api_key else None
+        self.client = _get_async_client(api_key, base_url) if api_key else None
+        if self.client is None:
+            self.generate_response = self._disabled_response
+        # Prompt tokens billed vs. served from OpenAI's automatic prefix cache
+        self.usage_stats = {"prompt_tokens": 0, "cached_prompt_tokens": 0}
+        rpm = settings.OPENAI_MAX_REQUESTS_PER_MINUTE
+        tpm = settings.OPENAI_MAX_TOKENS_PER_MINUTE
+        self.rpm_gate = TokenBucket(rpm) if rpm > 0 else None
+        self.tpm_gate = TokenBucket(tpm) if tpm > 0 else None
+        self.request_slots = _request_slots(settings.AI_MAX_CONCURRENT_REQUESTS)
+        self.breaker = CircuitBreaker()
+
+    async def _throttle(self, prompt: str, system_prompt: str, model: str, max_tokens: int) -> None:
+        """Wait for request and token budget; OpenAI counts max_tokens against TPM."""
+        if self.rpm_gate:
+            await self.rpm_gate.acquire()
+        if self.tpm_gate:
+            prompt_tokens = count_tokens(system_prompt, model) + count_tokens(prompt, model)
+            await self.tpm_gate.acquire(prompt_tokens + max_tokens)
+
+    def _record_usage(self, usage: Any) -> None:
+        if usage is None:
+            return
+        self.usage_stats["prompt_tokens"] += usage.prompt_tokens or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.usage_stats["cached_prompt_tokens"] += getattr(details, "cached_tokens", None) or 0
     
-    async def generate_response(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
-        if not self.client:
-            return "AI service not configured. Set OPENAI_API_KEY."
-        try:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: str = "") -> List[Dict[str, str]]:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    async def _create_completion(self, prompt: str, system_prompt: str = "", **kwargs) -> Any:
+        """Throttled chat completion returning the raw response; API errors propagate."""
+        model, temperature, max_tokens = self.request_settings(**kwargs)
+        await self._throttle(prompt, system_prompt, model, max_tokens)
+        extra = {"logprobs": True} if kwargs.get("logprobs") else {}
+        async with self.request_slots:
             response = await self.client.chat.completions.create(
-                model=kwargs.get("model", self.config.model),
-                messages=messages,
-                temperature=kwargs.get("temperature", self.config.temperature),
-                max_tokens=kwargs.get("max_tokens", self.config.max_tokens)
+                model=model,
+                messages=self._build_messages(prompt, system_prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra
             )
-            return response.choices[0].message.content
-        except Exception as e:
+        self._record_usage(response.usage)
+        return response
+
+    async def _disabled_response(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        return self._NOT_CONFIGURED
+
+    async def _guarded_completion(self, prompt: str, system_prompt: str = "", **kwargs) -> Any:
+        """_create_completion behind the circuit breaker; None while the breaker is open."""
+        if not self.breaker.allow():
+            return None
+        try:
+            response = await self._create_completion(prompt, system_prompt, **kwargs)
+        except _BREAKER_ERRORS:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    async def generate_response(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        # Only API failures become an error string; cancellation and
+        # programming errors propagate with their traceback intact.
+        try:
+            response = await self._guarded_completion(prompt, system_prompt, **kwargs)
+        except openai.APIError as e:
+            logger.exception("OpenAI request failed")
             return f"AI service error: {str(e)}"
+        if response is None:
+            return self._UNAVAILABLE
+        return response.choices[0].message.content
     
-    async def generate_code_feedback(self, code: str, analysis_results: Dict[str, Any]) -> str:
-        system_prompt = "You are an expert programming instructor. Be encouraging but honest."
-        prompt = f"""Analyze this code and provide feedback:
+    async def generate_response_stream(self, prompt: str, system_prompt: str = "", **kwargs):
+        """
+        Stream the response as it is generated.
+
+        Yields:
+            str: text deltas in arrival order
+        """
+        if not self.client:
+            yield self._NOT_CONFIGURED
+            return
+        if not self.breaker.allow():
+            yield self._UNAVAILABLE
+            return
+        model, temperature, max_tokens = self.request_settings(**kwargs)
+        await self._throttle(prompt, system_prompt, model, max_tokens)
+        try:
+            async with self.request_slots:
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=self._build_messages(prompt, system_prompt),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True
+                )
+                self.breaker.record_success()
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except openai.APIError as e:
+            if isinstance(e, _BREAKER_ERRORS):
+                self.breaker.record_failure()
+            logger.exception("OpenAI stream failed")
+            yield f"AI service error: {str(e)}"
+
+    # Static instructions come first and the submission last, so every call
+    # shares the same prompt prefix and hits OpenAI's prompt cache.
+    _FEEDBACK_SYSTEM_PROMPT = """You are an expert programming instructor. Be encouraging but honest.
+For each submission provide: 1) What's good 2) Areas to improve 3) Specific suggestions"""
+    _FEEDBACK_TEMPLATE = """Analyze this code and provide feedback:
+Analysis: Style={style_score}, Complexity={complexity}
+Issues: {issues}
 ```python
 {code}
-```
-Analysis: Style={analysis_results.get('style_score', 'N/A')}, Complexity={analysis_results.get('complexity', 'N/A')}
-Issues: {analysis_results.get('issues', [])}
+```"""
 
-Provide: 1) What's good 2) Areas to improve 3) Specific suggestions"""
+    @classmethod
+    def code_feedback_prompts(cls, code: str, analysis_results: Dict[str, Any]) -> Tuple[str, str]:
+        """Return (system_prompt, prompt) for code feedback."""
+        values = defaultdict(lambda: "N/A", analysis_results)
+        values.setdefault("issues", [])
+        values["code"] = code
+        return cls._FEEDBACK_SYSTEM_PROMPT, cls._FEEDBACK_TEMPLATE.format_map(values)
+
+    async def generate_code_feedback(self, code: str, analysis_results: Dict[str, Any]) -> str:
+        system_prompt, prompt = self.code_feedback_prompts(code, analysis_results)
         return await self.generate_response(prompt, system_prompt)
     
     async def answer_question(self, question: str, context: str = "") -> Dict[str, Any]:
         system_prompt = "You are a helpful teaching assistant. Provide clear, educational answers."
         prompt = f"Question: {question}\n{f'Context: {context}' if context else ''}"
-        answer = await self.generate_response(prompt, system_prompt)
-        confidence = 0.85 if len(answer) > 100 else 0.6
-        needs_review = "not sure" in answer.lower() or "might be" in answer.lower()
-        return {"answer": answer, "confidence": confidence, "needs_teacher_review": needs_review, "sources": []}
+        confidence, error = None, True
+        if not self.client:
+            answer = self._NOT_CONFIGURED
+        else:
+            try:
+                response = await self._guarded_completion(
+                    prompt, system_prompt, logprobs=settings.OPENAI_LOGPROBS
+                )
+            except openai.APIError as e:
+                logger.exception("OpenAI request failed")
+                answer = f"AI service error: {str(e)}"
+            else:
+                if response is None:
+                    answer = self._UNAVAILABLE
+                else:
+                    choice = response.choices[0]
+                    answer, error = choice.message.content, False
+                    confidence = self._logprob_confidence(choice)
+        if error:
+            confidence = 0.0
+        elif confidence is None:
+            confidence = 0.85 if len(answer) > 100 else 0.6
+        needs_review = error or bool(_UNCERTAIN_PATTERN.search(answer))
+        return {
+            "answer": answer,
+            "confidence": confidence,
+            "needs_teacher_review": needs_review,
+            "sources": [],
+            "error": error
+        }
     
-    async def categorize_question(self, question: str) -> str:
+    @staticmethod
+    def _logprob_confidence(choice: Any) -> Optional[float]:
+        """Geometric-mean token probability of the answer, or None without logprobs."""
+        tokens = getattr(getattr(choice, "logprobs", None), "content", None)
+        if not tokens:
+            return None
+        mean_logprob = sum(token.logprob for token in tokens) / len(tokens)
+        return round(math.exp(mean_logprob), 2)
+
+    async def classify_question(self, question: str) -> Optional[str]:
+        # Obvious keywords settle the category without an API round-trip
+        category = _en_keyword_category(question)
+        if category:
+            return category
         prompt = f"""Categorize: {question}
 Categories: basic, intermediate, advanced, administrative
 Respond with only the category."""
-        response = await self.generate_response(prompt, max_tokens=20)
+        # Labels are at most 2-3 tokens; don't reserve more output than that
+        response = await self.generate_response(prompt, max_tokens=5)
         cat = response.strip().lower()
-        return cat if cat in ["basic", "intermediate", "advanced", "administrative"] else "intermediate"
+        return cat if cat in _VALID_CATEGORIES else None
 
 
 class LocalLLMProvider(BaseAIProvider):
-    """Local LLM provider - placeholder for llama-cpp-python or transformers."""
+    """
+    Local LLM provider backed by llama-cpp-python.
+
+    Point LOCAL_LLM_MODEL_PATH at a Q4_K_M-quantized GGUF model: 4-bit weights
+    need a quarter of the fp16 memory bandwidth, which is what bounds token
+    throughput on CPU. Without a model the keyword fallbacks below are used.
+    """
 
     def __init__(self, config: AIConfig):
         self.config = config
         self.model = None
+        # llama.cpp contexts are not thread-safe; one generation at a time
+        self._model_lock = asyncio.Lock()
+
+    @staticmethod
+    def _load_model() -> "Llama":
+        model = Llama(
+            model_path=settings.LOCAL_LLM_MODEL_PATH,
+            n_ctx=settings.LOCAL_LLM_N_CTX,
+            n_gpu_layers=settings.LOCAL_LLM_GPU_LAYERS,
+            n_threads=os.cpu_count(),
+            verbose=False
+        )
+        # Reuse the KV cache across prompts sharing a prefix (same system prompt)
+        model.set_cache(LlamaRAMCache())
+        return model
+
+    _NOT_CONFIGURED = "Local LLM not configured. Install llama-cpp-python."
+
+    def request_settings(self, **kwargs) -> Tuple[str, float, int]:
+        # The loaded GGUF file, not config.model, decides what answers
+        return (
+            settings.LOCAL_LLM_MODEL_PATH,
+            kwargs.get("temperature", self.config.temperature),
+            kwargs.get("max_tokens", self.config.max_tokens),
+        )
 
     async def generate_response(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
-        return "Local LLM not configured. Install llama-cpp-python."
+        if Llama is None:
+            return self._NOT_CONFIGURED
+        if not settings.LOCAL_LLM_MODEL_PATH:
+            return "Local LLM not configured. Set LOCAL_LLM_MODEL_PATH."
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        try:
+            async with self._model_lock:
+                if self.model is None:
+                    self.model = await asyncio.to_thread(self._load_model)
+                # Inference blocks for seconds; keep it off the event loop
+                _, temperature, max_tokens = self.request_settings(**kwargs)
+                response = await asyncio.to_thread(
+                    self.model.create_chat_completion,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+            return response["choices"][0]["message"]["content"]
+        except Exception:
+            # A bad model path or a failed generation degrades like a missing model
+            logger.exception("Local LLM generation failed")
+            return self._NOT_CONFIGURED
 
     async def generate_code_feedback(self, code: str, analysis_results: Dict[str, Any]) -> str:
         parts = []
@@ -126,122 +651,143 @@ class LocalLLMProvider(BaseAIProvider):
         return "\n".join(parts)
 
     async def answer_question(self, question: str, context: str = "") -> Dict[str, Any]:
-        q = question.lower()
-        responses = {
-            "recursion": "Recursion is when a function calls itself with a base case.",
-            "loop": "Loops repeat code. Use 'for' for known iterations, 'while' for conditions.",
-            "function": "Functions are reusable code blocks defined with 'def'.",
+        words = set(_WORD_PATTERN.findall(question.lower()))
+        # Match plurals ("loops", "functions") as well
+        words.update([w[:-1] for w in words if w.endswith("s")])
+        hits = _LOCAL_ANSWER_KEYWORDS & words
+        if hits:
+            kw = next(kw for kw in _LOCAL_ANSWERS if kw in hits)
+            return {
+                "answer": _LOCAL_ANSWERS[kw], "confidence": 0.7, "needs_teacher_review": True,
+                "sources": [], "error": False
+            }
+        return {
+            "answer": "Requires teacher assistance.", "confidence": 0.3, "needs_teacher_review": True,
+            "sources": [], "error": False
         }
-        for kw, resp in responses.items():
-            if kw in q:
-                return {"answer": resp, "confidence": 0.7, "needs_teacher_review": True, "sources": []}
-        return {"answer": "Requires teacher assistance.", "confidence": 0.3, "needs_teacher_review": True, "sources": []}
 
-    async def categorize_question(self, question: str) -> str:
-        q = question.lower()
-        if any(k in q for k in ["deadline", "grade", "submit"]): return "administrative"
-        if any(k in q for k in ["optimize", "design", "scale"]): return "advanced"
-        if any(k in q for k in ["what is", "define"]): return "basic"
-        return "intermediate"
+    async def classify_question(self, question: str) -> Optional[str]:
+        return _en_keyword_category(question)
 
 
 class FastChatProvider(BaseAIProvider):
     """FastChat local deployment provider - OpenAI-compatible API for local LLMs."""
 
+    _UNAVAILABLE = "FastChat服务错误: 服务暂时不可用，请稍后重试"
+
     def __init__(self, config: AIConfig):
         self.config = config
         base_url = settings.FASTCHAT_API_BASE
         self.model_name = settings.FASTCHAT_MODEL_NAME
-        self.client = AsyncOpenAI(
-            api_key="EMPTY",  # FastChat doesn't require API key
-            base_url=base_url,
-            timeout=settings.FASTCHAT_TIMEOUT
-        )
+        # FastChat doesn't require API key
+        self.client = _get_async_client("EMPTY", base_url, settings.FASTCHAT_TIMEOUT)
+        self.request_slots = _request_slots(settings.AI_MAX_CONCURRENT_REQUESTS)
+        self.breaker = CircuitBreaker()
         logger.info(f"FastChatProvider initialized with base_url={base_url}, model={self.model_name}")
 
+    def request_settings(self, **kwargs) -> Tuple[str, float, int]:
+        return (
+            kwargs.get("model", self.model_name),
+            kwargs.get("temperature", settings.FASTCHAT_TEMPERATURE),
+            kwargs.get("max_tokens", settings.FASTCHAT_MAX_TOKENS),
+        )
+
     async def generate_response(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
         """Generate response using FastChat API."""
+        if not self.breaker.allow():
+            return self._UNAVAILABLE
         try:
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
 
-            response = await self.client.chat.completions.create(
-                model=kwargs.get("model", self.model_name),
-                messages=messages,
-                temperature=kwargs.get("temperature", settings.FASTCHAT_TEMPERATURE),
-                max_tokens=kwargs.get("max_tokens", settings.FASTCHAT_MAX_TOKENS)
-            )
+            model, temperature, max_tokens = self.request_settings(**kwargs)
+            async with self.request_slots:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+            self.breaker.record_success()
             return response.choices[0].message.content
         except Exception as e:
+            if isinstance(e, _BREAKER_ERRORS):
+                self.breaker.record_failure()
             logger.error(f"FastChat API error: {str(e)}")
             return f"FastChat服务错误: {str(e)}"
 
-    async def generate_code_feedback(self, code: str, analysis_results: Dict[str, Any]) -> str:
-        """Generate code feedback optimized for Chinese programming education."""
-        system_prompt = """你是一位经验丰富的编程教学助手。请用中文提供代码反馈。
-要求：
-1. 语言友好、鼓励性强，但要诚实指出问题
-2. 适合中国学生的学习习惯
-3. 提供具体的改进建议和示例"""
-
-        # Format analysis results
-        style_score = analysis_results.get('style_score', 'N/A')
-        complexity = analysis_results.get('complexity', 'N/A')
-        issues = analysis_results.get('issues', [])
-        issues_str = "\n".join([f"- {issue}" for issue in issues]) if issues else "无明显问题"
-
-        prompt = f"""请分析以下代码并提供反馈：
+    async def generate_response_stream(self, prompt: str, system_prompt: str = "", **kwargs):
+        """
+        流式生成响应，首个片段生成后立即返回
 
-```python
-{code}
-```
+        Yields:
+            str: 每次生成的文本片段
+        """
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
 
-代码分析结果：
-- 代码风格评分: {style_score}
-- 复杂度: {complexity}
-- 发现的问题:
-{issues_str}
+        if not self.breaker.allow():
+            yield self._UNAVAILABLE
+            return
+        try:
+            model, temperature, max_tokens = self.request_settings(**kwargs)
+            async with self.request_slots:
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True
+                )
+                self.breaker.record_success()
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except Exception as e:
+            if isinstance(e, _BREAKER_ERRORS):
+                self.breaker.record_failure()
+            logger.error(f"FastChat API stream error: {str(e)}")
+            yield f"FastChat服务错误: {str(e)}"
 
-请提供：
-1. 代码的优点（做得好的地方）
-2. 需要改进的地方
-3. 具体的改进建议（包括代码示例）
-4. 学习建议（推荐的学习资源或概念）"""
+    @staticmethod
+    def code_feedback_prompts(code: str, analysis_results: Dict[str, Any]) -> Tuple[str, str]:
+        """Return (system_prompt, prompt) for code feedback."""
+        return _ZH_FEEDBACK_SYSTEM_PROMPT, _zh_code_feedback_prompt(code, analysis_results)
 
+    async def generate_code_feedback(self, code: str, analysis_results: Dict[str, Any]) -> str:
+        """Generate code feedback optimized for Chinese programming education."""
+        system_prompt, prompt = self.code_feedback_prompts(code, analysis_results)
         return await self.generate_response(prompt, system_prompt)
 
     async def answer_question(self, question: str, context: str = "") -> Dict[str, Any]:
         """Answer student questions with Chinese language optimization."""
-        system_prompt = """你是一位专业的编程教学助手。请用中文回答学生的问题。
-要求：
-1. 回答清晰、准确、易于理解
-2. 适合中国学生的认知水平
-3. 提供实际的代码示例
-4. 鼓励学生深入思考"""
-
-        prompt = f"学生问题: {question}\n"
-        if context:
-            prompt += f"\n相关背景: {context}\n"
-
-        prompt += "\n请提供详细的回答，包括概念解释和代码示例（如果适用）。"
-
         try:
-            answer = await self.generate_response(prompt, system_prompt)
+            answer = await self.generate_response(
+                _zh_answer_prompt(question, context), _ZH_ANSWER_SYSTEM_PROMPT
+            )
+
+            # generate_response reports API failures as an error string
+            error = answer.startswith(_ERROR_RESPONSE_PREFIXES)
 
             # Calculate confidence based on answer quality
-            confidence = 0.85 if len(answer) > 100 else 0.6
+            if error:
+                confidence = 0.0
+            else:
+                confidence = 0.85 if len(answer) > 100 else 0.6
 
             # Check if answer indicates uncertainty
-            uncertainty_keywords = ["不确定", "可能", "也许", "不太清楚", "需要确认"]
-            needs_review = any(keyword in answer for keyword in uncertainty_keywords)
+            needs_review = error or bool(_ZH_UNCERTAIN_PATTERN.search(answer))
 
             return {
                 "answer": answer,
                 "confidence": confidence,
                 "needs_teacher_review": needs_review,
-                "sources": []
+                "sources": [],
+                "error": error
             }
         except Exception as e:
             logger.error(f"Error answering question: {str(e)}")
@@ -249,11 +795,28 @@ class FastChatProvider(BaseAIProvider):
                 "answer": f"抱歉，回答问题时出现错误: {str(e)}",
                 "confidence": 0.0,
                 "needs_teacher_review": True,
-                "sources": []
+                "sources": [],
+                "error": True
             }
 
-    async def categorize_question(self, question: str) -> str:
-        """Categorize student questions using AI."""
+    async def answer_question_stream(self, question: str, context: str = ""):
+        """
+        流式回答学生问题
+
+        Yields:
+            str: 每次生成的文本片段
+        """
+        async for chunk in self.generate_response_stream(
+            _zh_answer_prompt(question, context), _ZH_ANSWER_SYSTEM_PROMPT
+        ):
+            yield chunk
+
+    async def classify_question(self, question: str) -> Optional[str]:
+        """Categorize student questions, asking the model only when no keyword matches."""
+        category = _zh_keyword_category(question)
+        if category:
+            return category
+
         prompt = f"""请将以下学生问题分类到一个类别中：
 
 问题: {question}
@@ -270,25 +833,11 @@ class FastChatProvider(BaseAIProvider):
             response = await self.generate_response(prompt, max_tokens=20)
             category = response.strip().lower()
 
-            # Validate category
-            valid_categories = ["basic", "intermediate", "advanced", "administrative"]
-            if category in valid_categories:
-                return category
-
-            # Fallback: simple keyword matching
-            q_lower = question.lower()
-            if any(k in q_lower for k in ["什么是", "定义", "基础", "入门"]):
-                return "basic"
-            elif any(k in q_lower for k in ["截止", "成绩", "提交", "分数"]):
-                return "administrative"
-            elif any(k in q_lower for k in ["优化", "架构", "设计", "性能"]):
-                return "advanced"
-            else:
-                return "intermediate"
+            return category if category in _VALID_CATEGORIES else None
 
         except Exception as e:
             logger.error(f"Error categorizing question: {str(e)}")
-            return "intermediate"
+            return None
 
 
 class DeepSeekProvider(BaseAIProvider):
@@ -300,18 +849,26 @@ class DeepSeekProvider(BaseAIProvider):
         base_url = settings.DEEPSEEK_API_BASE
         self.model_name = settings.DEEPSEEK_MODEL
         timeout = settings.DEEPSEEK_TIMEOUT if hasattr(settings, 'DEEPSEEK_TIMEOUT') else 60
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url,
-            timeout=timeout
-        )
+        self.client = _get_async_client(api_key, base_url, timeout)
+        self.breaker = CircuitBreaker()
         logger.info(f"DeepSeekProvider initialized with base_url={base_url}, model={self.model_name}, timeout={timeout}s")
 
+    def request_settings(self, **kwargs) -> Tuple[str, float, int]:
+        return (
+            kwargs.get("model", self.model_name),
+            kwargs.get("temperature", settings.DEEPSEEK_TEMPERATURE),
+            kwargs.get("max_tokens", settings.DEEPSEEK_MAX_TOKENS),
+        )
+
     async def generate_response(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
         """Generate response using DeepSeek API with retry mechanism."""
         max_retries = settings.DEEPSEEK_MAX_RETRIES if hasattr(settings, 'DEEPSEEK_MAX_RETRIES') else 3
         retry_delay = settings.DEEPSEEK_RETRY_DELAY if hasattr(settings, 'DEEPSEEK_RETRY_DELAY') else 1.0
 
+        # 熔断期间直接失败，不再逐次等待超时和重试
+        if not self.breaker.allow():
+            return "DeepSeek服务错误: 服务暂时不可用，请稍后重试"
+
         for attempt in range(max_retries + 1):
             try:
                 messages = []
@@ -319,9 +876,7 @@ class DeepSeekProvider(BaseAIProvider):
                     messages.append({"role": "system", "content": system_prompt})
                 messages.append({"role": "user", "content": prompt})
 
-                model = kwargs.get("model", self.model_name)
-                temperature = kwargs.get("temperature", settings.DEEPSEEK_TEMPERATURE)
-                max_tokens = kwargs.get("max_tokens", settings.DEEPSEEK_MAX_TOKENS)
+                model, temperature, max_tokens = self.request_settings(**kwargs)
 
                 # 记录请求详情
                 logger.info(f"DeepSeek API 请求 (尝试 {attempt + 1}/{max_retries + 1})")
@@ -331,14 +886,14 @@ class DeepSeekProvider(BaseAIProvider):
                 logger.info(f"  消息数量: {len(messages)}")
                 logger.debug(f"  提示词长度: {len(prompt)} 字符")
 
-                start_time = time.time()
+                start_time = time.monotonic()
                 response = await self.client.chat.completions.create(
                     model=model,
                     messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens
                 )
-                elapsed_time = time.time() - start_time
+                elapsed_time = time.monotonic() - start_time
 
                 # 记录响应详情
                 response_content = response.choices[0].message.content
@@ -347,6 +902,7 @@ class DeepSeekProvider(BaseAIProvider):
                 logger.info(f"  响应长度: {len(response_content)} 字符")
                 logger.debug(f"  响应内容预览: {response_content[:100]}...")
 
+                self.breaker.record_success()
                 return response_content
 
             except asyncio.TimeoutError as e:
@@ -357,6 +913,7 @@ class DeepSeekProvider(BaseAIProvider):
                 if attempt == max_retries:
                     error_msg = f"DeepSeek服务超时: 请求超过 {settings.DEEPSEEK_TIMEOUT if hasattr(settings, 'DEEPSEEK_TIMEOUT') else 60} 秒未响应"
                     logger.error(f"DeepSeek API 在 {max_retries + 1} 次尝试后仍然超时")
+                    self.breaker.record_failure()
                     return error_msg
 
                 await asyncio.sleep(retry_delay * (2 ** attempt))
@@ -368,13 +925,14 @@ class DeepSeekProvider(BaseAIProvider):
                 logger.error(f"  错误消息: {str(e)}")
 
                 # 记录完整的错误堆栈（仅在调试模式下）
-                import traceback
                 logger.debug(f"  错误堆栈:\n{traceback.format_exc()}")
 
                 # 如果是最后一次尝试，返回详细错误消息
                 if attempt == max_retries:
                     error_msg = f"DeepSeek服务错误 ({error_type}): {str(e)}"
                     logger.error(f"DeepSeek API 在 {max_retries + 1} 次尝试后失败")
+                    if isinstance(e, _BREAKER_ERRORS):
+                        self.breaker.record_failure()
                     return error_msg
 
                 # 等待后重试（指数退避）
@@ -432,85 +990,46 @@ class DeepSeekProvider(BaseAIProvider):
         Yields:
             str: 每次生成的文本片段
         """
-        system_prompt = """你是一位专业的编程教学助手。请用中文回答学生的问题。
-要求：
-1. 回答清晰、准确、易于理解
-2. 适合中国学生的认知水平
-3. 提供实际的代码示例
-4. 鼓励学生深入思考"""
-
-        prompt = f"学生问题: {question}\n"
-        if context:
-            prompt += f"\n相关背景: {context}\n"
-        prompt += "\n请提供详细的回答，包括概念解释和代码示例（如果适用）。"
-
-        async for chunk in self.generate_response_stream(prompt, system_prompt):
+        async for chunk in self.generate_response_stream(
+            _zh_answer_prompt(question, context), _ZH_ANSWER_SYSTEM_PROMPT
+        ):
             yield chunk
 
+    @staticmethod
+    def code_feedback_prompts(code: str, analysis_results: Dict[str, Any]) -> Tuple[str, str]:
+        """Return (system_prompt, prompt) for code feedback."""
+        return _ZH_FEEDBACK_SYSTEM_PROMPT, _zh_code_feedback_prompt(code, analysis_results)
+
     async def generate_code_feedback(self, code: str, analysis_results: Dict[str, Any]) -> str:
         """Generate code feedback optimized for Chinese programming education."""
-        system_prompt = """你是一位经验丰富的编程教学助手。请用中文提供代码反馈。
-要求：
-1. 语言友好、鼓励性强，但要诚实指出问题
-2. 适合中国学生的学习习惯
-3. 提供具体的改进建议和示例"""
-
-        # Format analysis results
-        style_score = analysis_results.get('style_score', 'N/A')
-        complexity = analysis_results.get('complexity', 'N/A')
-        issues = analysis_results.get('issues', [])
-        issues_str = "\n".join([f"- {issue}" for issue in issues]) if issues else "无明显问题"
-
-        prompt = f"""请分析以下代码并提供反馈：
-
-```python
-{code}
-```
-
-代码分析结果：
-- 代码风格评分: {style_score}
-- 复杂度: {complexity}
-- 发现的问题:
-{issues_str}
-
-请提供：
-1. 代码的优点（做得好的地方）
-2. 需要改进的地方
-3. 具体的改进建议（包括代码示例）
-4. 学习建议（推荐的学习资源或概念）"""
-
+        system_prompt, prompt = self.code_feedback_prompts(code, analysis_results)
         return await self.generate_response(prompt, system_prompt)
 
     async def answer_question(self, question: str, context: str = "") -> Dict[str, Any]:
         """Answer student questions with Chinese language optimization."""
-        system_prompt = """你是一位专业的编程教学助手。请用中文回答学生的问题。
-要求：
-1. 回答清晰、准确、易于理解
-2. 适合中国学生的认知水平
-3. 提供实际的代码示例
-4. 鼓励学生深入思考"""
-
-        prompt = f"学生问题: {question}\n"
-        if context:
-            prompt += f"\n相关背景: {context}\n"
-
-        prompt += "\n请提供详细的回答，包括概念解释和代码示例（如果适用）。"
-
         try:
-            answer = await self.generate_response(prompt, system_prompt)
+            answer = await self.generate_response(
+                _zh_answer_prompt(question, context), _ZH_ANSWER_SYSTEM_PROMPT
+            )
+
+            # generate_response reports API failures as an error string
+            error = answer.startswith(_ERROR_RESPONSE_PREFIXES)
 
             # Calculate confidence based on answer quality
-            confidence = 0.85 if len(answer) > 100 else 0.6
+            if error:
+                confidence = 0.0
+            else:
+                confidence = 0.85 if len(answer) > 100 else 0.6
 
             # Check if answer indicates uncertainty
-            uncertainty_keywords = ["不确定", "可能", "也许", "不太清楚", "需要确认"]
-            needs_review = any(keyword in answer for keyword in uncertainty_keywords)
+            needs_review = error or bool(_ZH_UNCERTAIN_PATTERN.search(answer))
 
             return {
                 "answer": answer,
                 "confidence": confidence,
                 "needs_teacher_review": needs_review,
-                "sources": []
+                "sources": [],
+                "error": error
             }
         except Exception as e:
             logger.error(f"Error answering question: {str(e)}")
@@ -518,11 +1037,16 @@ class DeepSeekProvider(BaseAIProvider):
                 "answer": f"抱歉，回答问题时出现错误: {str(e)}",
                 "confidence": 0.0,
                 "needs_teacher_review": True,
-                "sources": []
+                "sources": [],
+                "error": True
             }
 
-    async def categorize_question(self, question: str) -> str:
-        """Categorize student questions using AI."""
+    async def classify_question(self, question: str) -> Optional[str]:
+        """Categorize student questions, asking the model only when no keyword matches."""
+        category = _zh_keyword_category(question)
+        if category:
+            return category
+
         prompt = f"""请将以下学生问题分类到一个类别中：
 
 问题: {question}
@@ -539,56 +1063,184 @@ class DeepSeekProvider(BaseAIProvider):
             response = await self.generate_response(prompt, max_tokens=20)
             category = response.strip().lower()
 
-            # Validate category
-            valid_categories = ["basic", "intermediate", "advanced", "administrative"]
-            if category in valid_categories:
-                return category
-
-            # Fallback: simple keyword matching
-            q_lower = question.lower()
-            if any(k in q_lower for k in ["什么是", "定义", "基础", "入门"]):
-                return "basic"
-            elif any(k in q_lower for k in ["截止", "成绩", "提交", "分数"]):
-                return "administrative"
-            elif any(k in q_lower for k in ["优化", "架构", "设计", "性能"]):
-                return "advanced"
-            else:
-                return "intermediate"
+            return category if category in _VALID_CATEGORIES else None
 
         except Exception as e:
             logger.error(f"Error categorizing question: {str(e)}")
-            return "intermediate"
+            return None
+
+
+# Providers without an implementation (e.g. ANTHROPIC) fall back to LocalLLMProvider
+_PROVIDER_CLASSES: Dict[AIProvider, Type[BaseAIProvider]] = {
+    AIProvider.OPENAI: OpenAIProvider,
+    AIProvider.LOCAL: LocalLLMProvider,
+    AIProvider.FASTCHAT: FastChatProvider,
+    AIProvider.DEEPSEEK: DeepSeekProvider,
+}
+
+
+class QuestionCache:
+    """
+    LRU cache for answers to repeated questions.
+
+    Entries are keyed by the sha256 of the question and its context with case
+    folded and whitespace runs collapsed, so questions that differ only in
+    case or spacing share an answer. Punctuation is kept: ``xs[-1]`` and
+    ``xs[1]`` or ``a == b`` and ``a = b`` are different questions.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(text: str, context: str = "") -> Optional[str]:
+        text = " ".join(text.lower().split())
+        if not text:
+            return None
+        context = " ".join(context.lower().split())
+        return hashlib.sha256(f"{text}\0{context}".encode()).hexdigest()
+
+    def get(self, text: str, context: str = "") -> Optional[Any]:
+        """Return the value cached for ``text`` and ``context`` (after normalisation), if any."""
+        key = self._key(text, context)
+        if key is None or key not in self._entries:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def set(self, text: str, value: Any, context: str = "") -> None:
+        key = self._key(text, context)
+        if key is None:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
 
 
 class AIService:
     """Enhanced AI Service with extended functionality."""
 
+    # generate_response only reuses completions sampled near-deterministically
+    CACHE_MAX_TEMPERATURE = 0.3
+    # Grading and code feedback sample at this temperature so a re-graded
+    # submission is served from the response cache
+    GRADING_TEMPERATURE = 0.2
+    # In-process generate_response cache size when Redis is not configured
+    RESPONSE_CACHE_MAX_ENTRIES = 256
+    # Redis stream shared by all worker processes (see _publish_interaction)
+    INTERACTION_STREAM = "ai:interactions"
+    INTERACTION_STREAM_MAXLEN = 10000
+    # Upper bound on in-flight provider calls in generate_code_feedback_many
+    MAX_CONCURRENT_REQUESTS = 50
+
     def __init__(self, config: Optional[AIConfig] = None):
         self.config = config or AIConfig()
 
         # Select provider based on configuration
         if settings.USE_DEEPSEEK:
-            logger.info("Using DeepSeek provider")
             self.config.provider = AIProvider.DEEPSEEK
-            self.provider = DeepSeekProvider(self.config)
         elif settings.USE_FASTCHAT:
-            logger.info("Using FastChat provider")
             self.config.provider = AIProvider.FASTCHAT
-            self.provider = FastChatProvider(self.config)
-        elif self.config.provider == AIProvider.OPENAI:
-            logger.info("Using OpenAI provider")
-            self.provider = OpenAIProvider(self.config)
-        else:
-            logger.info("Using Local LLM provider")
-            self.provider = LocalLLMProvider(self.config)
-
-        self._interaction_history: List[Dict[str, Any]] = []
+        provider_class = _PROVIDER_CLASSES.get(self.config.provider, LocalLLMProvider)
+        logger.info(f"Using {provider_class.__name__} for provider '{self.config.provider.value}'")
+        self.provider = provider_class(self.config)
+
+        # Only the last 100 interactions are kept in memory
+        self._interaction_history: Deque[Dict[str, Any]] = deque(maxlen=100)
+        # Running totals over _interaction_history so stats are O(1)
+        self._latency_sum = 0.0
+        self._type_counts: Counter = Counter()
+        self._publish_tasks: set = set()
+        self._answer_cache = QuestionCache()
+        self._category_cache = QuestionCache()
+        self._response_cache: OrderedDict[str, str] = OrderedDict()
+        # Whether Redis backs the response cache; resolved on first use
+        self._shared_response_cache: Optional[bool] = None
+        # Lookups of cacheable generate_response requests (shared or local)
+        self._response_hits = 0
+        self._response_misses = 0
+
+        # Raced against self.provider when AI_RACE_PROVIDERS is on
+        self._race_rivals: List[BaseAIProvider] = []
+        if settings.AI_RACE_PROVIDERS:
+            for provider_type, configured in (
+                (AIProvider.OPENAI, bool(settings.OPENAI_API_KEY)),
+                (AIProvider.DEEPSEEK, bool(settings.DEEPSEEK_API_KEY)),
+                (AIProvider.FASTCHAT, settings.USE_FASTCHAT),
+            ):
+                if configured and provider_type != self.config.provider:
+                    self._race_rivals.append(
+                        _PROVIDER_CLASSES[provider_type](AIConfig(provider=provider_type))
+                    )
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP clients used by the providers."""
+        await close_shared_clients()
 
     async def generate_code_feedback(self, code: str, analysis_results: Dict[str, Any]) -> str:
-        return await self.provider.generate_code_feedback(code, analysis_results)
+        # Model-backed providers go through the response cache; the rule-based
+        # local provider answers directly
+        if not hasattr(self.provider, "code_feedback_prompts"):
+            return await self.provider.generate_code_feedback(code, analysis_results)
+        system_prompt, prompt = self.provider.code_feedback_prompts(code, analysis_results)
+        return await self.generate_response(prompt, system_prompt, temperature=self.GRADING_TEMPERATURE)
 
     async def answer_question(self, question: str, context: str = "") -> Dict[str, Any]:
-        return await self.provider.answer_question(question, context)
+        # Only the same question (up to case/spacing) is answered from the
+        # cache, so it is reused whatever the sampling temperature
+        cached = self._answer_cache.get(question, context)
+        if cached is not None:
+            return dict(cached)
+        result = await self.provider.answer_question(question, context)
+        # Providers flag outages and error replies; those are never reused
+        if not result.get("error"):
+            self._answer_cache.set(question, dict(result), context)
+        return result
+
+    async def _gather_bounded(
+        self,
+        calls: List[Callable[[], Awaitable[Any]]],
+        max_concurrent: int
+    ) -> List[Any]:
+        """Run calls concurrently, at most max_concurrent at a time, keeping input order."""
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def run(call: Callable[[], Awaitable[Any]]) -> Any:
+            async with semaphore:
+                return await call()
+
+        return await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+
+    async def generate_code_feedback_many(
+        self,
+        items: List[Tuple[str, Dict[str, Any]]],
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS
+    ) -> List[Any]:
+        """
+        Generate feedback for many (code, analysis_results) pairs concurrently.
+
+        Results are returned in input order; an item that failed is returned
+        as its exception instead of aborting the whole batch.
+        """
+        return await self._gather_bounded(
+            [functools.partial(self.generate_code_feedback, code, results) for code, results in items],
+            max_concurrent
+        )
 
     async def answer_question_stream(self, question: str, context: str = ""):
         """流式回答学生问题"""
@@ -601,10 +1253,186 @@ class AIService:
             yield result.get("answer", "")
 
     async def categorize_question(self, question: str) -> str:
-        return await self.provider.categorize_question(question)
+        cached = self._category_cache.get(question)
+        if cached is not None:
+            return cached
+        # A provider that failed reports None, so it never beats a real label
+        category = await self._race(
+            [
+                functools.partial(provider.classify_question, question)
+                for provider in (self.provider, *self._race_rivals)
+            ],
+            lambda label: label is not None
+        )
+        if category is None:
+            return _FALLBACK_CATEGORY
+        self._category_cache.set(question, category)
+        return category
 
     async def generate_response(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
-        return await self.provider.generate_response(prompt, system_prompt, **kwargs)
+        """
+        Generate a response, reusing an identical earlier request's output.
+
+        The cache key hashes the full request (provider, plus the model,
+        temperature and max_tokens the provider will actually use, system
+        prompt and prompt), so only byte-identical requests such as a
+        re-graded submission are served from the cache. Requests sampled above
+        CACHE_MAX_TEMPERATURE always go to the provider. Without Redis the
+        responses are kept in a bounded in-process LRU.
+        """
+        model, temperature, max_tokens = self.provider.request_settings(**kwargs)
+        if temperature > self.CACHE_MAX_TEMPERATURE:
+            return await self.provider.generate_response(prompt, system_prompt, **kwargs)
+
+        request_key = "\x1f".join((
+            self.config.provider.value,
+            str(model),
+            str(temperature),
+            str(max_tokens),
+            system_prompt,
+            prompt,
+        ))
+        cache_key = CacheKeys.llm_response(
+            PROMPT_VERSION, hashlib.blake2b(request_key.encode(), digest_size=20).hexdigest()
+        )
+        if self._shared_response_cache is None:
+            self._shared_response_cache = await cache_service.get_redis_client() is not None
+        shared = self._shared_response_cache
+        if shared:
+            cached = await cache_service.get(cache_key)
+            if cached is not None:
+                self._response_hits += 1
+                return cached["response"]
+        elif cache_key in self._response_cache:
+            self._response_cache.move_to_end(cache_key)
+            self._response_hits += 1
+            return self._response_cache[cache_key]
+        self._response_misses += 1
+
+        response = await self.provider.generate_response(prompt, system_prompt, **kwargs)
+        if response and not response.startswith(_ERROR_RESPONSE_PREFIXES):
+            if shared:
+                await cache_service.set(cache_key, {"response": response}, CacheService.TTL_WEEK)
+            else:
+                self._response_cache[cache_key] = response
+                while len(self._response_cache) > self.RESPONSE_CACHE_MAX_ENTRIES:
+                    self._response_cache.popitem(last=False)
+        return response
+
+    @staticmethod
+    async def _race(
+        calls: List[Callable[[], Awaitable[Any]]],
+        is_usable: Callable[[Any], bool]
+    ) -> Any:
+        """
+        Run calls concurrently and return the first usable result.
+
+        The losers are cancelled. When no call produces a usable result the
+        first call's outcome is returned (or raised), as if it ran alone.
+        """
+        if len(calls) == 1:
+            return await calls[0]()
+        tasks = [asyncio.ensure_future(call()) for call in calls]
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and is_usable(task.result()):
+                        return task.result()
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_response_stream(self, prompt: str, system_prompt: str = ""):
+        """Stream a response, falling back to a single chunk for non-streaming providers."""
+        if hasattr(self.provider, "generate_response_stream"):
+            async for chunk in self.provider.generate_response_stream(prompt, system_prompt):
+                yield chunk
+        else:
+            yield await self.provider.generate_response(prompt, system_prompt)
+
+    async def _stream_and_log(self, interaction_type: str, prompt: str, system_prompt: str):
+        start_time = time.monotonic()
+        parts = []
+        async for chunk in self.generate_response_stream(prompt, system_prompt):
+            parts.append(chunk)
+            yield chunk
+        latency_ms = (time.monotonic() - start_time) * 1000
+        self._log_interaction(interaction_type, prompt, "".join(parts), latency_ms)
+
+    # Sections an explanation covers; with AI_EXPLAIN_PARALLEL_SECTIONS the
+    # concepts and complexity sections are separate, concurrent short completions
+    _EXPLAIN_SECTIONS = (
+        "A clear explanation of what the code does",
+        "Key concepts used in the code",
+        "Any complexity notes (time/space complexity if relevant)",
+        "Suggested learning resources or topics to explore",
+    )
+    _CONCEPTS_PROMPT = """List the key programming concepts used in this {language} code.
+One concept per line, no explanations.
+
+```{language}
+{code}
+```"""
+    _COMPLEXITY_PROMPT = """In two or three sentences, state the time and space complexity of this {language} code.
+
+```{language}
+{code}
+```"""
+
+    @staticmethod
+    def _explain_code_prompts(
+        code: str,
+        language: str,
+        detail_level: str,
+        student_level: str,
+        sections: Tuple[str, ...] = _EXPLAIN_SECTIONS
+    ) -> Tuple[str, str]:
+        """Return (system_prompt, prompt) for explain_code."""
+        system_prompt = """You are an expert programming tutor.
+Adjust your explanation to the student's level and the requested level of detail."""
+
+        prompt = f"""Explain this {language} code to a {student_level} level student.
+Provide a {detail_level} level of detail.
+
+```{language}
+{code}
+```
+
+Provide:
+"""
+        prompt += "\n".join(f"{i}. {section}" for i, section in enumerate(sections, 1))
+        return system_prompt, prompt
+
+    @staticmethod
+    def _suggest_improvements_prompts(
+        code: str,
+        language: str,
+        focus_areas: Optional[List[str]],
+        max_suggestions: int,
+        include_refactored_code: bool
+    ) -> Tuple[str, str]:
+        """Return (system_prompt, prompt) for suggest_improvements."""
+        focus_str = ", ".join(focus_areas) if focus_areas else "general improvements"
+
+        system_prompt = """You are an expert code reviewer.
+Provide actionable, specific suggestions."""
+
+        prompt = f"""Review this {language} code and suggest up to {max_suggestions} improvements.
+Focus on: {focus_str}
+
+```{language}
+{code}
+```
+
+For each suggestion:
+1. Describe the issue
+2. Explain why it matters
+3. Show how to fix it
+{"4. Provide a refactored version of the code" if include_refactored_code else ""}"""
+        return system_prompt, prompt
 
     async def explain_code(
         self,
@@ -625,35 +1453,46 @@ class AIService:
         Returns:
             Dictionary with explanation, key concepts, and resources
         """
-        start_time = time.time()
-
-        system_prompt = f"""You are an expert programming tutor explaining {language} code.
-Adjust your explanation for a {student_level} level student.
-Provide a {detail_level} level of detail."""
-
-        prompt = f"""Explain this {language} code:
-
-```{language}
-{code}
-```
-
-Provide:
-1. A clear explanation of what the code does
-2. Key concepts used in the code
-3. Any complexity notes (time/space complexity if relevant)
-4. Suggested learning resources or topics to explore"""
-
-        response = await self.generate_response(prompt, system_prompt)
-        latency_ms = (time.time() - start_time) * 1000
+        start_time = time.monotonic()
+        if settings.AI_EXPLAIN_PARALLEL_SECTIONS:
+            system_prompt, prompt = self._explain_code_prompts(
+                code, language, detail_level, student_level,
+                sections=(self._EXPLAIN_SECTIONS[0], self._EXPLAIN_SECTIONS[3])
+            )
+            # Three short completions in parallel finish sooner than one long one
+            response, concepts, complexity = await asyncio.gather(
+                self.generate_response(prompt, system_prompt),
+                self.generate_response(
+                    self._CONCEPTS_PROMPT.format(language=language, code=code), system_prompt, max_tokens=200
+                ),
+                self.generate_response(
+                    self._COMPLEXITY_PROMPT.format(language=language, code=code), system_prompt, max_tokens=150
+                )
+            )
+        else:
+            system_prompt, prompt = self._explain_code_prompts(code, language, detail_level, student_level)
+            response = await self.generate_response(prompt, system_prompt)
+            concepts = complexity = None
+        latency_ms = (time.monotonic() - start_time) * 1000
 
         # Log interaction
         self._log_interaction("explain_code", prompt, response, latency_ms)
 
+        if concepts and not concepts.startswith(_ERROR_RESPONSE_PREFIXES):
+            key_concepts = [
+                line.strip("0123456789.-* ").strip() for line in concepts.splitlines()
+            ]
+            key_concepts = [concept for concept in key_concepts if concept][:5]
+        else:
+            key_concepts = self._extract_concepts(response)
+        if not complexity or complexity.startswith(_ERROR_RESPONSE_PREFIXES):
+            complexity = None
+
         return {
             "success": True,
             "explanation": response,
-            "key_concepts": self._extract_concepts(response),
-            "complexity_notes": None,
+            "key_concepts": key_concepts,
+            "complexity_notes": complexity,
             "learning_resources": [],
             "latency_ms": latency_ms
         }
@@ -679,28 +1518,13 @@ Provide:
         Returns:
             Dictionary with suggestions and optionally refactored code
         """
-        start_time = time.time()
-
-        focus_str = ", ".join(focus_areas) if focus_areas else "general improvements"
-
-        system_prompt = f"""You are an expert code reviewer for {language}.
-Focus on: {focus_str}
-Provide actionable, specific suggestions."""
-
-        prompt = f"""Review this {language} code and suggest up to {max_suggestions} improvements:
-
-```{language}
-{code}
-```
-
-For each suggestion:
-1. Describe the issue
-2. Explain why it matters
-3. Show how to fix it
-{"4. Provide a refactored version of the code" if include_refactored_code else ""}"""
+        start_time = time.monotonic()
+        system_prompt, prompt = self._suggest_improvements_prompts(
+            code, language, focus_areas, max_suggestions, include_refactored_code
+        )
 
         response = await self.generate_response(prompt, system_prompt)
-        latency_ms = (time.time() - start_time) * 1000
+        latency_ms = (time.monotonic() - start_time) * 1000
 
         self._log_interaction("suggest_improvements", prompt, response, latency_ms)
 
@@ -712,6 +1536,64 @@ For each suggestion:
             "latency_ms": latency_ms
         }
 
+    async def explain_code_stream(
+        self,
+        code: str,
+        language: str = "python",
+        detail_level: str = "medium",
+        student_level: str = "intermediate"
+    ):
+        """
+        Stream a code explanation; arguments match explain_code.
+
+        Yields:
+            str: explanation text as it is generated
+        """
+        system_prompt, prompt = self._explain_code_prompts(code, language, detail_level, student_level)
+        async for chunk in self._stream_and_log("explain_code", prompt, system_prompt):
+            yield chunk
+
+    async def suggest_improvements_stream(
+        self,
+        code: str,
+        language: str = "python",
+        focus_areas: List[str] = None,
+        max_suggestions: int = 5,
+        include_refactored_code: bool = True
+    ):
+        """
+        Stream improvement suggestions; arguments match suggest_improvements.
+
+        Yields:
+            str: review text as it is generated
+        """
+        system_prompt, prompt = self._suggest_improvements_prompts(
+            code, language, focus_areas, max_suggestions, include_refactored_code
+        )
+        async for chunk in self._stream_and_log("suggest_improvements", prompt, system_prompt):
+            yield chunk
+
+    @staticmethod
+    def _answer_student_question_prompts(
+        question: str,
+        code: Optional[str],
+        language: str,
+        context: Optional[str]
+    ) -> Tuple[str, str]:
+        """Return (system_prompt, prompt) for answer_student_question."""
+        system_prompt = """You are a helpful teaching assistant.
+Provide clear, educational answers that help students learn.
+Include examples when helpful."""
+
+        prompt = f"Question: {question}\n"
+        if code:
+            prompt += f"\nRelated code:\n```{language}\n{code}\n```\n"
+        if context:
+            prompt += f"\nContext: {context}\n"
+
+        prompt += "\nProvide a clear answer and suggest related concepts to explore."
+        return system_prompt, prompt
+
     async def answer_student_question(
         self,
         question: str,
@@ -731,22 +1613,11 @@ For each suggestion:
         Returns:
             Dictionary with answer, related concepts, and follow-up questions
         """
-        start_time = time.time()
-
-        system_prompt = """You are a helpful teaching assistant.
-Provide clear, educational answers that help students learn.
-Include examples when helpful."""
-
-        prompt = f"Question: {question}\n"
-        if code:
-            prompt += f"\nRelated code:\n```{language}\n{code}\n```\n"
-        if context:
-            prompt += f"\nContext: {context}\n"
-
-        prompt += "\nProvide a clear answer and suggest related concepts to explore."
+        start_time = time.monotonic()
+        system_prompt, prompt = self._answer_student_question_prompts(question, code, language, context)
 
         response = await self.generate_response(prompt, system_prompt)
-        latency_ms = (time.time() - start_time) * 1000
+        latency_ms = (time.monotonic() - start_time) * 1000
 
         self._log_interaction("answer_question", prompt, response, latency_ms)
 
@@ -759,6 +1630,18 @@ Include examples when helpful."""
             "latency_ms": latency_ms
         }
 
+    async def answer_student_question_stream(
+        self,
+        question: str,
+        code: Optional[str] = None,
+        language: str = "python",
+        context: Optional[str] = None
+    ):
+        """Stream the answer to a student's question; see answer_student_question."""
+        system_prompt, prompt = self._answer_student_question_prompts(question, code, language, context)
+        async for chunk in self._stream_and_log("answer_question", prompt, system_prompt):
+            yield chunk
+
     def _log_interaction(
         self,
         interaction_type: str,
@@ -767,25 +1650,52 @@ Include examples when helpful."""
         latency_ms: float
     ):
         """Log an AI interaction for history tracking."""
-        self._interaction_history.append({
+        history = self._interaction_history
+        if len(history) == history.maxlen:
+            evicted = history[0]
+            self._latency_sum -= evicted["latency_ms"]
+            self._type_counts[evicted["type"]] -= 1
+            if not self._type_counts[evicted["type"]]:
+                del self._type_counts[evicted["type"]]
+        self._latency_sum += latency_ms
+        self._type_counts[interaction_type] += 1
+        entry = {
             "type": interaction_type,
             "prompt_length": len(prompt),
             "response_length": len(response),
             "latency_ms": latency_ms,
             "timestamp": time.time()
-        })
-        # Keep only last 100 interactions in memory
-        if len(self._interaction_history) > 100:
-            self._interaction_history = self._interaction_history[-100:]
+        }
+        history.append(entry)
+
+        # Mirror to Redis so every worker process feeds the same history
+        try:
+            task = asyncio.get_running_loop().create_task(self._publish_interaction(entry))
+        except RuntimeError:
+            return  # called outside an event loop; local history only
+        self._publish_tasks.add(task)
+        task.add_done_callback(self._publish_tasks.discard)
+
+    async def _publish_interaction(self, entry: Dict[str, Any]) -> None:
+        """XADD the entry to the shared, length-capped interaction stream."""
+        try:
+            client = await cache_service.get_redis_client()
+            if client is None:
+                return
+            await client.xadd(
+                self.INTERACTION_STREAM,
+                {k: str(v) for k, v in entry.items()},
+                maxlen=self.INTERACTION_STREAM_MAXLEN,
+                approximate=True
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish AI interaction to Redis: {e}")
 
     def _extract_concepts(self, text: str) -> List[str]:
         """Extract key concepts from AI response."""
         concepts = []
-        keywords = ["concept", "principle", "pattern", "technique", "method"]
-        lines = text.split("\n")
-        for line in lines:
-            line_lower = line.lower()
-            if any(kw in line_lower for kw in keywords):
+        for line in text.split("\n"):
+            if _CONCEPT_PATTERN.search(line):
                 # Clean up the line
                 clean = line.strip("- *#").strip()
                 if len(clean) > 5 and len(clean) < 100:
@@ -799,7 +1709,7 @@ Include examples when helpful."""
         current_suggestion = None
 
         for line in lines:
-            if line.strip().startswith(("1.", "2.", "3.", "4.", "5.", "-", "*")):
+            if line.strip().startswith(_SUGGESTION_PREFIXES):
                 if current_suggestion:
                     suggestions.append(current_suggestion)
                 current_suggestion = {
@@ -816,48 +1726,88 @@ Include examples when helpful."""
 
     def _extract_code_block(self, text: str) -> Optional[str]:
         """Extract code block from AI response."""
-        import re
-        pattern = r"```[\w]*\n(.*?)```"
-        matches = re.findall(pattern, text, re.DOTALL)
+        matches = _CODE_BLOCK_PATTERN.findall(text)
         return matches[-1].strip() if matches else None
 
     def _generate_follow_ups(self, question: str) -> List[str]:
         """Generate follow-up questions based on the original question."""
-        q_lower = question.lower()
-        follow_ups = []
-
-        if "how" in q_lower:
-            follow_ups.append("What are the alternatives to this approach?")
-        if "why" in q_lower:
-            follow_ups.append("What would happen if we did it differently?")
-        if "error" in q_lower or "bug" in q_lower:
-            follow_ups.append("How can I prevent this issue in the future?")
-        if "function" in q_lower or "method" in q_lower:
-            follow_ups.append("How can I test this function effectively?")
+        follow_ups = [
+            follow_up for pattern, follow_up in _FOLLOW_UP_RULES
+            if pattern.search(question)
+        ]
 
         if not follow_ups:
             follow_ups = ["Can you explain this in more detail?"]
 
         return follow_ups[:3]
 
+    def question_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters of the in-process answer and category caches."""
+        return {
+            "answers": self._answer_cache.stats(),
+            "categories": self._category_cache.stats()
+        }
+
+    def response_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the generate_response cache; entries counts the local LRU only."""
+        return {
+            "entries": len(self._response_cache),
+            "hits": self._response_hits,
+            "misses": self._response_misses
+        }
+
     def get_interaction_stats(self) -> Dict[str, Any]:
         """Get statistics about AI interactions."""
         if not self._interaction_history:
             return {"total_interactions": 0}
 
         total = len(self._interaction_history)
-        avg_latency = sum(i["latency_ms"] for i in self._interaction_history) / total
+        stats = {
+            "total_interactions": total,
+            "average_latency_ms": self._latency_sum / total,
+            "by_type": dict(self._type_counts),
+            "question_cache": self.question_cache_stats(),
+            "response_cache": self.response_cache_stats()
+        }
+        usage_stats = getattr(self.provider, "usage_stats", None)
+        if usage_stats is not None:
+            stats["prompt_cache"] = dict(usage_stats)
+        return stats
 
-        by_type = {}
-        for interaction in self._interaction_history:
-            t = interaction["type"]
-            by_type[t] = by_type.get(t, 0) + 1
+    async def get_shared_interaction_stats(self) -> Dict[str, Any]:
+        """
+        Interaction statistics across all worker processes.
 
-        return {
+        Computed over the most recent entries of the shared Redis stream fed
+        by _publish_interaction, using the same 100-interaction window as
+        get_interaction_stats; falls back to this process's history when
+        Redis is not in use.
+        """
+        try:
+            client = await cache_service.get_redis_client()
+            if client is None:
+                return self.get_interaction_stats()
+            entries = await client.xrevrange(
+                self.INTERACTION_STREAM, count=self._interaction_history.maxlen
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read AI interaction stats from Redis: {e}")
+            return self.get_interaction_stats()
+
+        if not entries:
+            return {"total_interactions": 0}
+        total = len(entries)
+        stats = {
             "total_interactions": total,
-            "average_latency_ms": avg_latency,
-            "by_type": by_type
+            "average_latency_ms": sum(float(fields["latency_ms"]) for _, fields in entries) / total,
+            "by_type": dict(Counter(fields["type"] for _, fields in entries)),
+            "question_cache": self.question_cache_stats(),
+            "response_cache": self.response_cache_stats()
         }
+        usage_stats = getattr(self.provider, "usage_stats", None)
+        if usage_stats is not None:
+            stats["prompt_cache"] = dict(usage_stats)
+        return stats
 
 
 ai_service = AIService()
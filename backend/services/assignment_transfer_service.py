@@ -2,15 +2,21 @@
 作业传输服务 - 处理教师端提交和文件管理系统的集成
 """
 import asyncio
+import codecs
+import errno
 import os
 import shutil
-from typing import Dict, List, Optional, Tuple
+import sys
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
 from core.time import utc_now
 import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import aiofiles
+
 from schemas.assignment_transfer import (
     TeacherAssignmentSubmit,
     BatchUploadRequest,
@@ -25,9 +31,107 @@ from schemas.assignment import AssignmentSubmission
 from services.grading_service import grading_service
 from services.plagiarism_service import enhanced_plagiarism_service
 from utils.crud import crud_assignment
+from core.config import settings
 from core.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# 附件分块写入的块大小（1 MiB）
+_WRITE_CHUNK_SIZE = 1024 * 1024
+# 允许上传的文件扩展名
+_ALLOWED_EXTENSIONS = frozenset({
+    '.py', '.java', '.cpp', '.c', '.js', '.ts', '.pdf', '.docx', '.txt', '.zip'
+})
+# 扩展名到编程语言的映射
+_EXTENSION_LANGUAGES = {
+    '.py': 'python',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.c': 'cpp',
+    '.js': 'javascript',
+    '.ts': 'javascript',
+}
+# 单个文件大小上限（10MB）
+_MAX_FILE_SIZE = 10 * 1024 * 1024
+# 完整同步时并行复制文件的线程数
+_COPY_WORKERS = 8
+
+
+def _scan_files(path: str):
+    """
+    递归遍历目录，逐个返回文件的 os.DirEntry
+    """
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_files(entry.path)
+            elif entry.is_file():
+                yield entry
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+# 内核态复制方式，按优先级尝试（copy_file_range 在支持 reflink 的文件系统上可直接克隆）
+# sendfile 只有 Linux 支持以普通文件为输出（macOS/BSD 要求输出端是 socket）
+_KERNEL_COPIES = tuple(
+    copy for name, copy in (("copy_file_range", _copy_file_range), ("sendfile", _sendfile))
+    if hasattr(os, name) and (name != "sendfile" or sys.platform.startswith("linux"))
+)
+# 这些错误表示当前文件系统或平台不支持该复制方式，换下一种即可
+_COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP}
+
+
+def _fast_copy(source_file: str, target_file: str) -> None:
+    """
+    在内核中复制文件内容（不经过用户态缓冲），并像 shutil.copy2 一样保留时间戳
+    """
+    with open(source_file, 'rb') as fsrc, open(target_file, 'wb') as fdst:
+        src_stat = os.fstat(fsrc.fileno())
+        for kernel_copy in _KERNEL_COPIES:
+            try:
+                offset = 0
+                while offset < src_stat.st_size:
+                    copied = kernel_copy(fsrc.fileno(), fdst.fileno(), offset, src_stat.st_size - offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+                break
+            except OSError as e:
+                # 尚未复制任何数据时，任何错误都换下一种方式重试
+                if offset and e.errno not in _COPY_FALLBACK_ERRNOS:
+                    raise
+                fdst.seek(0)
+                fdst.truncate()
+        else:
+            shutil.copyfileobj(fsrc, fdst)
+    os.utime(target_file, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+
+class _ZipStream:
+    """
+    zipfile 的只写输出目标：暂存写入的数据，由调用方分段取走
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
 
 class AssignmentTransferService:
     """作业传输服务类"""
@@ -42,6 +146,20 @@ class AssignmentTransferService:
         os.makedirs(self.file_manager_dir, exist_ok=True)
         os.makedirs(self.temp_dir, exist_ok=True)
 
+        # 后台同步任务：限制并发数量，并持有引用以免任务在运行中被回收
+        self._sync_slots = asyncio.Semaphore(max(1, settings.FILE_SYNC_CONCURRENCY))
+        self._bg_tasks: set = set()
+        # 本进程内已确认存在的目录，避免重复的 makedirs 系统调用
+        self._ensured_dirs: set = set()
+        # 增量同步缓存：目标文件路径 -> 最近一次同步时的
+        # (源文件修改时间, 目标文件修改时间, 目标文件大小)
+        self._synced_stats: Dict[str, Tuple[float, float, int]] = {}
+        # 完整同步使用的复制线程池
+        self._copy_pool = ThreadPoolExecutor(
+            max_workers=_COPY_WORKERS,
+            thread_name_prefix="assignment-sync"
+        )
+
     async def submit_assignment_from_teacher(
         self, 
         assignment_data: TeacherAssignmentSubmit
@@ -72,10 +190,13 @@ class AssignmentTransferService:
                     assignment_data.file_name
                 )
                 
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                self._ensure_dir(os.path.dirname(file_path))
                 
-                with open(file_path, 'wb') as f:
-                    f.write(assignment_data.file_attachment)
+                # 分块写入，单次写入的缓冲不超过 _WRITE_CHUNK_SIZE
+                attachment = memoryview(assignment_data.file_attachment)
+                async with aiofiles.open(file_path, 'wb') as f:
+                    for offset in range(0, len(attachment), _WRITE_CHUNK_SIZE):
+                        await f.write(attachment[offset:offset + _WRITE_CHUNK_SIZE])
                 
                 assignment_record["attachment_path"] = file_path
             
@@ -109,6 +230,9 @@ class AssignmentTransferService:
         successfully_uploaded = 0
         failed_uploads = 0
         validation_results = []
+        # 先验证全部文件，再交给工作线程一次性写入，避免逐个文件阻塞事件循环
+        pending_writes: List[Tuple[str, str]] = []
+        max_failures = settings.BATCH_UPLOAD_MAX_FAILURES
         
         try:
             for submission in batch_request.student_submissions:
@@ -121,8 +245,13 @@ class AssignmentTransferService:
                 validation_result = self._validate_file(file_name, file_content.encode())
                 validation_results.append(validation_result)
                 
-                if validation_result.is_valid:
-                    # 保存文件
+                if not validation_result.is_valid:
+                    failed_uploads += 1
+                    # 无效文件过多时放弃整批，不再验证剩余文件
+                    if max_failures and failed_uploads > max_failures:
+                        pending_writes.clear()
+                        break
+                else:
                     file_path = os.path.join(
                         self.upload_dir,
                         batch_request.course_id,
@@ -131,27 +260,22 @@ class AssignmentTransferService:
                         student_id,
                         file_name
                     )
+                    pending_writes.append((file_path, file_content))
                     
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                    
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(file_content)
-                    
-                    # 创建提交记录（模拟）
+                    # 创建提交记录（模拟），内容随 pending_writes 写入磁盘，记录中不再保留副本
                     submission_record = AssignmentSubmission(
                         student_id=student_id,
                         assignment_id=batch_request.assignment_id,
                         assignment_type="code",  # 默认为代码作业
-                        content=file_content,
                         file_name=file_name
                     )
                     
                     # 如果需要立即评分，可以在这里调用评分服务
                     # await grading_service.grade_submission(submission_record)
-                    
-                    successfully_uploaded += 1
-                else:
-                    failed_uploads += 1
+            
+            # 保存文件
+            successfully_uploaded = await asyncio.to_thread(self._write_text_files, pending_writes)
+            failed_uploads = total_files - successfully_uploaded
         
         except Exception as e:
             return BatchUploadResponse(
@@ -169,12 +293,14 @@ class AssignmentTransferService:
         # 如果需要同步到文件管理系统
         if batch_request.sync_to_file_manager:
             # 异步启动同步任务
-            asyncio.create_task(
+            task = asyncio.create_task(
                 self._sync_to_file_manager_async(
                     batch_request.assignment_id,
                     batch_request.course_id
                 )
             )
+            self._bg_tasks.add(task)
+            task.add_done_callback(self._bg_tasks.discard)
         
         return BatchUploadResponse(
             upload_id=upload_id,
@@ -188,41 +314,64 @@ class AssignmentTransferService:
             end_time=datetime.now()
         )
 
+    def _write_text_files(self, files: List[Tuple[str, str]]) -> int:
+        """
+        批量写入文本文件（在工作线程中运行），返回写入成功的文件数
+        """
+        written = 0
+        for file_path, content in files:
+            try:
+                self._ensure_dir(os.path.dirname(file_path))
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                written += 1
+            except OSError:
+                # 目录可能已被外部删除，下次重新创建
+                self._ensured_dirs.discard(os.path.dirname(file_path))
+                continue
+        return written
+
+    def _ensure_dir(self, path: str) -> None:
+        """
+        确保目录存在，同一目录在本进程内只创建一次
+        """
+        if path in self._ensured_dirs:
+            return
+        os.makedirs(path, exist_ok=True)
+        self._ensured_dirs.add(path)
+
     def _validate_file(self, filename: str, content: bytes) -> FileValidationResult:
         """
         验证上传的文件
         """
-        errors = []
         file_size = len(content)
         
-        # 检查文件扩展名
-        allowed_extensions = ['.py', '.java', '.cpp', '.c', '.js', '.ts', '.pdf', '.docx', '.txt', '.zip']
-        file_ext = '.' + filename.split('.')[-1].lower() if '.' in filename else ''
-        
-        if file_ext not in allowed_extensions:
-            errors.append(f"不支持的文件类型: {file_ext}")
+        def invalid(error: str) -> FileValidationResult:
+            return FileValidationResult(
+                filename=filename,
+                is_valid=False,
+                validation_errors=[error],
+                file_size=file_size,
+                detected_language=None
+            )
         
+        # 按开销从小到大检查，任一项失败即返回
         # 检查文件大小（限制为10MB）
-        if file_size > 10 * 1024 * 1024:  # 10MB
-            errors.append(f"文件过大: {file_size} 字节，最大允许 10MB")
+        if file_size > _MAX_FILE_SIZE:
+            return invalid(f"文件过大: {file_size} 字节，最大允许 10MB")
         
-        # 检测编程语言
-        detected_language = None
-        if file_ext in ['.py']:
-            detected_language = 'python'
-        elif file_ext in ['.java']:
-            detected_language = 'java'
-        elif file_ext in ['.cpp', '.c']:
-            detected_language = 'cpp'
-        elif file_ext in ['.js', '.ts']:
-            detected_language = 'javascript'
+        # 检查文件扩展名
+        file_ext = os.path.splitext(filename)[1].lower()
+        if file_ext not in _ALLOWED_EXTENSIONS:
+            return invalid(f"不支持的文件类型: {file_ext}")
         
         return FileValidationResult(
             filename=filename,
-            is_valid=len(errors) == 0,
-            validation_errors=errors,
+            is_valid=True,
+            validation_errors=[],
             file_size=file_size,
-            detected_language=detected_language
+            # 检测编程语言
+            detected_language=_EXTENSION_LANGUAGES.get(file_ext)
         )
 
     async def sync_with_file_manager(
@@ -292,27 +441,26 @@ class AssignmentTransferService:
             request.assignment_id
         )
         
-        os.makedirs(target_dir, exist_ok=True)
+        self._ensure_dir(target_dir)
         
-        # 复制文件
-        total_files = 0
-        processed_files = 0
-        failed_files = 0
+        # 遍历目录后交给复制线程池并行复制，一个文件的读写可以与其他文件的建目录、复制重叠
+        source_files = await asyncio.to_thread(
+            lambda: [entry.path for entry in _scan_files(source_dir)]
+        )
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(
+                self._copy_pool,
+                self._copy_file,
+                source_file,
+                os.path.join(target_dir, os.path.relpath(source_file, source_dir))
+            )
+            for source_file in source_files
+        ))
         
-        for root, dirs, files in os.walk(source_dir):
-            for file in files:
-                total_files += 1
-                try:
-                    source_file = os.path.join(root, file)
-                    rel_path = os.path.relpath(source_file, source_dir)
-                    target_file = os.path.join(target_dir, rel_path)
-                    
-                    os.makedirs(os.path.dirname(target_file), exist_ok=True)
-                    shutil.copy2(source_file, target_file)
-                    
-                    processed_files += 1
-                except Exception:
-                    failed_files += 1
+        total_files = len(results)
+        processed_files = sum(results)
+        failed_files = total_files - processed_files
         
         return {
             "total_files": total_files,
@@ -320,6 +468,24 @@ class AssignmentTransferService:
             "failed_files": failed_files
         }
 
+    def _copy_file(self, source_file: str, target_file: str) -> bool:
+        """
+        复制单个文件，返回是否成功（完整同步时在复制线程池中运行）
+        """
+        target_dir = os.path.dirname(target_file)
+        try:
+            self._ensure_dir(target_dir)
+            try:
+                _fast_copy(source_file, target_file)
+            except FileNotFoundError:
+                # 目标目录可能已被外部删除，清除缓存后重建并重试一次
+                self._ensured_dirs.discard(target_dir)
+                self._ensure_dir(target_dir)
+                _fast_copy(source_file, target_file)
+            return True
+        except Exception:
+            return False
+
     async def _perform_incremental_sync(self, request: FileManagerSyncRequest) -> Dict:
         """
         执行增量同步
@@ -342,33 +508,47 @@ class AssignmentTransferService:
             request.assignment_id
         )
         
-        os.makedirs(target_dir, exist_ok=True)
+        self._ensure_dir(target_dir)
         
         # 增量同步逻辑：只复制修改时间更新的文件
         total_files = 0
         processed_files = 0
         failed_files = 0
         
-        for root, dirs, files in os.walk(source_dir):
-            for file in files:
-                total_files += 1
+        for entry in _scan_files(source_dir):
+            total_files += 1
+            try:
+                source_file = entry.path
+                rel_path = os.path.relpath(source_file, source_dir)
+                target_file = os.path.join(target_dir, rel_path)
+                source_mtime = entry.stat().st_mtime
                 try:
-                    source_file = os.path.join(root, file)
-                    rel_path = os.path.relpath(source_file, source_dir)
-                    target_file = os.path.join(target_dir, rel_path)
-                    
-                    # 检查目标文件是否存在且是否需要更新
-                    if (not os.path.exists(target_file) or 
-                        os.path.getmtime(source_file) > os.path.getmtime(target_file)):
-                        
-                        os.makedirs(os.path.dirname(target_file), exist_ok=True)
-                        shutil.copy2(source_file, target_file)
-                        processed_files += 1
-                    else:
-                        # 文件未更改，跳过
-                        processed_files += 1
-                except Exception:
-                    failed_files += 1
+                    target_stat = os.stat(target_file)
+                except FileNotFoundError:
+                    target_stat = None
+                
+                # 上次同步后源文件和目标文件均未变化，直接跳过
+                synced = self._synced_stats.get(target_file)
+                if target_stat is not None and synced == (
+                    source_mtime, target_stat.st_mtime, target_stat.st_size
+                ):
+                    processed_files += 1
+                    continue
+                
+                # 目标文件缺失、源文件更新，或目标文件在上次同步后被改动时重新复制
+                if (target_stat is None or synced is not None or
+                        source_mtime > target_stat.st_mtime):
+                    if not self._copy_file(source_file, target_file):
+                        failed_files += 1
+                        continue
+                    target_stat = os.stat(target_file)
+                # 否则文件未更改，跳过
+                self._synced_stats[target_file] = (
+                    source_mtime, target_stat.st_mtime, target_stat.st_size
+                )
+                processed_files += 1
+            except Exception:
+                failed_files += 1
         
         return {
             "total_files": total_files,
@@ -388,7 +568,8 @@ class AssignmentTransferService:
             target_path="assignments"
         )
         
-        await self._perform_incremental_sync(sync_request)
+        async with self._sync_slots:
+            await self._perform_incremental_sync(sync_request)
 
     async def get_assignment_submissions(
         self, 
@@ -411,42 +592,97 @@ class AssignmentTransferService:
             return []
         
         submissions = []
-        all_students = os.listdir(submissions_dir)
+        # scandir 的 DirEntry 自带类型信息，按名称排序保证分页稳定
+        with os.scandir(submissions_dir) as it:
+            all_students = sorted(it, key=lambda entry: entry.name)
         
         # 分页处理
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
         students_page = all_students[start_idx:end_idx]
         
-        for student_id in students_page:
-            student_dir = os.path.join(submissions_dir, student_id)
-            if os.path.isdir(student_dir):
-                files = os.listdir(student_dir)
-                for file_name in files:
-                    file_path = os.path.join(student_dir, file_name)
-                    stat = os.stat(file_path)
-                    
-                    submissions.append({
-                        "submission_id": f"{assignment_id}_{student_id}_{file_name}",
-                        "student_id": student_id,
-                        "student_name": f"Student {student_id}",  # 实际应用中应从数据库获取
-                        "file_name": file_name,
-                        "file_size": stat.st_size,
-                        "submitted_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        "status": "graded" if os.path.exists(file_path.replace('.', '_graded.')) else "pending",
-                        "content_preview": self._get_content_preview(file_path)
-                    })
+        for student_entry in students_page:
+            if not student_entry.is_dir():
+                continue
+            student_id = student_entry.name
+            with os.scandir(student_entry.path) as it:
+                files = list(it)
+            # 一次列目录得到全部文件名，批改结果文件的判断不再逐个 stat
+            file_names = {entry.name for entry in files}
+            for file_entry in files:
+                file_name = file_entry.name
+                stat = file_entry.stat()
+                
+                submissions.append({
+                    "submission_id": f"{assignment_id}_{student_id}_{file_name}",
+                    "student_id": student_id,
+                    "student_name": f"Student {student_id}",  # 实际应用中应从数据库获取
+                    "file_name": file_name,
+                    "file_size": stat.st_size,
+                    "submitted_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    "status": "graded" if file_name.replace('.', '_graded.') in file_names else "pending",
+                    "content_preview": await self._get_content_preview(file_entry.path)
+                })
         
         return submissions
 
-    def _get_content_preview(self, file_path: str, max_length: int = 100) -> str:
+    async def export_assignment_zip(
+        self,
+        assignment_id: str,
+        course_id: str
+    ) -> AsyncIterator[bytes]:
+        """
+        以流的方式导出作业全部提交的 ZIP 包（不压缩，不在磁盘上生成临时文件）
+        """
+        submissions_dir = os.path.join(
+            self.upload_dir,
+            course_id,
+            assignment_id,
+            "submissions"
+        )
+        files = []
+        if os.path.isdir(submissions_dir):
+            files = await asyncio.to_thread(
+                lambda: sorted(entry.path for entry in _scan_files(submissions_dir))
+            )
+        
+        stream = _ZipStream()
+        # 每个导出任务复用同一块读缓冲
+        buffer = bytearray(_WRITE_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED) as zf:
+            for file_path in files:
+                arcname = os.path.relpath(file_path, submissions_dir)
+                try:
+                    # strict_timestamps=False：1980 年之前的修改时间按 1980 年记录，而不是抛出 ValueError
+                    zinfo = await asyncio.to_thread(
+                        zipfile.ZipInfo.from_file, file_path, arcname, strict_timestamps=False
+                    )
+                    src = await asyncio.to_thread(open, file_path, 'rb')
+                except (OSError, ValueError):
+                    continue
+                with src, zf.open(zinfo, 'w') as dst:
+                    while size := await asyncio.to_thread(src.readinto, buffer):
+                        dst.write(view[:size])
+                        yield stream.drain()
+        # 关闭时写入中央目录
+        yield stream.drain()
+
+    async def _get_content_preview(self, file_path: str, max_length: int = 100) -> str:
         """
         获取文件内容预览
+
+        只读取文件开头 max_length * 4 + 1 字节（UTF-8 单个字符最多 4 字节），
+        与文件大小无关
         """
+        limit = max_length * 4 + 1
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                return content[:max_length] + ("..." if len(content) > max_length else "")
+            async with aiofiles.open(file_path, 'rb') as f:
+                raw = await f.read(limit)
+            # 增量解码器允许末尾被截断的多字节字符，其余非法字节仍按原逻辑视为无法预览
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            content = decoder.decode(raw, final=len(raw) < limit)
+            return content[:max_length] + ("..." if len(content) > max_length else "")
         except:
             return ""
 
@@ -9,6 +9,18 @@ from sqlalchemy import select, func
 from models.auth_log import AuthLog
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_metadata(metadata: Dict[str, Any]) -> str:
+    """序列化事件元数据, 优先使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(metadata)
+
 
 class AuthMonitorService:
     """认证监控服务 - 检测和记录可疑登录活动"""
@@ -46,6 +58,10 @@ class AuthMonitorService:
 
         Returns:
             AuthLog: 创建的日志记录
+
+        失败事件立即提交: 调用方随后会抛出异常使请求事务回滚, 而锁定判断依赖这些记录。
+        成功事件只加入会话, 随请求结束时 get_db 的提交一并写入, 不再单独提交和刷新,
+        因此返回的记录此时尚未分配 id。
         """
         auth_log = AuthLog(
             user_id=user_id,
@@ -55,11 +71,11 @@ class AuthMonitorService:
             ip_address=ip_address,
             user_agent=user_agent,
             failure_reason=failure_reason,
-            extra_data=json.dumps(metadata) if metadata else None
+            extra_data=_dumps_metadata(metadata) if metadata else None
         )
         db.add(auth_log)
-        await db.commit()
-        await db.refresh(auth_log)
+        if status != 'success':
+            await db.commit()
         return auth_log
     
     @staticmethod
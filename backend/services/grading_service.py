@@ -1,7 +1,8 @@
 """
 Grading Service - Handles automated assignment grading with AI and code analysis
 """
-from typing import List, Optional
+import logging
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from core.time import utc_now
 import uuid
@@ -11,12 +12,14 @@ from schemas.assignment import (
     CodeFeedback, ReportFeedback, PlagiarismResult, BatchGradingRequest,
     BatchGradingResponse, CodeQualityMetrics
 )
-from schemas.code_analysis import CodeAnalysisRequest
+from schemas.code_analysis import CodeAnalysisRequest, CodeAnalysisResult
 from services.code_analysis_service import code_analysis_service
 from services.ai_service import ai_service
 from services.plagiarism_service import plagiarism_service
 from schemas.plagiarism import PlagiarismCheckRequest
 
+logger = logging.getLogger(__name__)
+
 
 class GradingService:
     """Service for automated grading of assignments with AI integration."""
@@ -28,19 +31,24 @@ class GradingService:
 
     async def grade_submission(self, submission: AssignmentSubmission) -> GradingResult:
         """Grade a single assignment submission with AI and code analysis."""
-        submission_id = str(uuid.uuid4())
-        code_feedback = None
-        report_feedback = None
-
         if submission.assignment_type == AssignmentType.CODE:
-            code_feedback = await self._grade_code(submission)
+            return self._grading_result(submission, code_feedback=await self._grade_code(submission))
+        return self._grading_result(submission, report_feedback=await self._grade_report(submission))
+
+    def _grading_result(
+        self,
+        submission: AssignmentSubmission,
+        code_feedback: Optional[CodeFeedback] = None,
+        report_feedback: Optional[ReportFeedback] = None
+    ) -> GradingResult:
+        """Combine the code or report feedback into the overall grading result."""
+        if code_feedback is not None:
             overall_score = (
                 code_feedback.correctness_score * 0.4 +
                 code_feedback.style_score * 0.3 +
                 code_feedback.efficiency_score * 0.3
             )
         else:
-            report_feedback = await self._grade_report(submission)
             overall_score = (
                 report_feedback.completeness_score * 0.4 +
                 report_feedback.innovation_score * 0.3 +
@@ -48,7 +56,7 @@ class GradingService:
             )
 
         return GradingResult(
-            submission_id=submission_id, student_id=submission.student_id,
+            submission_id=str(uuid.uuid4()), student_id=submission.student_id,
             assignment_id=submission.assignment_id, assignment_type=submission.assignment_type,
             overall_score=round(overall_score, 2), status=GradingStatus.COMPLETED,
             code_feedback=code_feedback, report_feedback=report_feedback,
@@ -58,6 +66,19 @@ class GradingService:
 
     async def _grade_code(self, submission: AssignmentSubmission) -> CodeFeedback:
         """Grade code submission with static analysis and AI feedback."""
+        analysis, analysis_results = await self._analyze_code(submission)
+        ai_feedback = await self.ai.generate_code_feedback(submission.content, analysis_results)
+        return self._code_feedback(analysis, ai_feedback)
+
+    @staticmethod
+    def _code_scores(analysis: CodeAnalysisResult) -> Tuple[float, float]:
+        """(style_score, complexity_score) derived from the static analysis."""
+        style_score = analysis.style_analysis.score if analysis.style_analysis else 75.0
+        complexity_score = min(100, analysis.complexity_metrics.maintainability_index) if analysis.complexity_metrics else 70.0
+        return style_score, complexity_score
+
+    async def _analyze_code(self, submission: AssignmentSubmission) -> Tuple[CodeAnalysisResult, Dict[str, Any]]:
+        """Run static analysis; returns the analysis and the summary passed to the AI."""
         # Run static code analysis
         analysis_request = CodeAnalysisRequest(
             code=submission.content, language=submission.language or "python",
@@ -65,20 +86,21 @@ class GradingService:
         )
         analysis = await self.code_analyzer.analyze_code(analysis_request)
 
-        # Calculate scores from analysis
-        style_score = analysis.style_analysis.score if analysis.style_analysis else 75.0
-        complexity_score = min(100, analysis.complexity_metrics.maintainability_index) if analysis.complexity_metrics else 70.0
-
-        # Correctness score (would need test execution in production)
-        correctness_score = 85.0  # Placeholder - integrate with test runner
-
-        # Generate AI feedback
+        style_score, _ = self._code_scores(analysis)
         analysis_results = {
             'style_score': style_score,
             'complexity': analysis.complexity_metrics.cyclomatic_complexity if analysis.complexity_metrics else 0,
             'issues': [s.description for s in analysis.code_smells[:5]] if analysis.code_smells else []
         }
-        ai_feedback = await self.ai.generate_code_feedback(submission.content, analysis_results)
+        return analysis, analysis_results
+
+    def _code_feedback(self, analysis: CodeAnalysisResult, ai_feedback: Optional[str]) -> CodeFeedback:
+        """Build the code feedback from the static analysis and the AI feedback text."""
+        # Calculate scores from analysis
+        style_score, complexity_score = self._code_scores(analysis)
+
+        # Correctness score (would need test execution in production)
+        correctness_score = 85.0  # Placeholder - integrate with test runner
 
         # Build quality metrics
         quality_metrics = None
@@ -113,7 +135,9 @@ Report content:
 
 Provide brief comments and revision suggestions."""
 
-        ai_response = await self.ai.generate_response(prompt, "You are an expert academic reviewer.")
+        ai_response = await self.ai.generate_response(
+            prompt, "You are an expert academic reviewer.", temperature=self.ai.GRADING_TEMPERATURE
+        )
 
         # Parse AI response or use defaults
         return ReportFeedback(
@@ -125,7 +149,30 @@ Provide brief comments and revision suggestions."""
     async def batch_grade(self, request: BatchGradingRequest) -> BatchGradingResponse:
         """Grade multiple submissions in batch."""
         batch_id = str(uuid.uuid4())
-        results = [await self.grade_submission(sub) for sub in request.submissions]
+        submissions = request.submissions
+        code_indices = [
+            i for i, sub in enumerate(submissions) if sub.assignment_type == AssignmentType.CODE
+        ]
+        analyses = [await self._analyze_code(submissions[i]) for i in code_indices]
+        # The AI calls dominate batch time, so request every submission's feedback concurrently
+        ai_feedback = await self.ai.generate_code_feedback_many([
+            (submissions[i].content, analysis_results)
+            for i, (_, analysis_results) in zip(code_indices, analyses, strict=True)
+        ])
+        code_feedback = {}
+        for i, (analysis, _), feedback in zip(code_indices, analyses, ai_feedback, strict=True):
+            if isinstance(feedback, Exception):
+                # One failed AI call leaves that submission without AI feedback only
+                logger.warning(f"AI feedback failed for student {submissions[i].student_id}: {feedback}")
+                feedback = None
+            code_feedback[i] = self._code_feedback(analysis, feedback)
+
+        results = []
+        for i, sub in enumerate(submissions):
+            if i in code_feedback:
+                results.append(self._grading_result(sub, code_feedback=code_feedback[i]))
+            else:
+                results.append(self._grading_result(sub, report_feedback=await self._grade_report(sub)))
         return BatchGradingResponse(
             batch_id=batch_id, total_submissions=len(request.submissions),
             status=GradingStatus.COMPLETED, results=results
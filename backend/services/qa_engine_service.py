@@ -262,7 +262,7 @@ class QAEngineService:
                     context=""
                 )
                 answer = ai_result.get("answer", "")
-                if answer and len(answer) > 10:
+                if answer and len(answer) > 10 and not ai_result.get("error"):
                     answer_source = "ai"
                     status = QALogStatus.ANSWERED
                     triage_result = TriageResult.AUTO_REPLY
@@ -355,20 +355,15 @@ class QAEngineService:
 
     def _calculate_priority(self, difficulty: int, match_score: float) -> int:
         """计算优先级 (0-5)"""
-        # 难度越高、匹配度越低，优先级越高
-        priority = 0
-
-        if difficulty >= 4:
-            priority += 2
-        elif difficulty >= 3:
-            priority += 1
-
-        if match_score < self.LOW_MATCH_THRESHOLD:
-            priority += 2
-        elif match_score < self.MEDIUM_MATCH_THRESHOLD:
-            priority += 1
-
-        return min(priority, 5)
+        # 难度越高、匹配度越低，优先级越高。
+        # 阈值是递进的（难度 3/4，匹配度 MEDIUM/LOW），每跨过一级加 1，
+        # 直接对布尔值求和即可，无需 if/elif 分支。
+        return (
+            (difficulty >= 3)
+            + (difficulty >= 4)
+            + (match_score < self.MEDIUM_MATCH_THRESHOLD)
+            + (match_score < self.LOW_MATCH_THRESHOLD)
+        )
 
     async def get_stats(self, db: AsyncSession) -> QALogStats:
         """获取问答统计信息"""
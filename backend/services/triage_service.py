@@ -9,6 +9,7 @@ from typing import Optional, List
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, update, and_
+from pydantic import TypeAdapter
 
 from models.qa_log import QALog, TriageResult, QALogStatus
 from models.knowledge_base import KnowledgeBaseEntry
@@ -34,6 +35,24 @@ DIFFICULTY_LABELS = {
     5: "L5 - 专家级",
 }
 
+# 待处理队列只需要这些列；按列查询返回轻量 Row，避免为每行构建 ORM 实例
+_PENDING_COLUMNS = (
+    QALog.log_id,
+    QALog.question,
+    QALog.user_id,
+    QALog.user_name,
+    QALog.detected_category,
+    QALog.detected_difficulty,
+    QALog.match_score,
+    QALog.priority,
+    QALog.is_urgent,
+    QALog.triage_result,
+    QALog.created_at,
+)
+
+# 整批校验待处理问题，复用同一个 TypeAdapter
+_PENDING_LIST_ADAPTER = TypeAdapter(List[PendingQuestion])
+
 
 class TriageService:
     """分诊服务"""
@@ -172,36 +191,35 @@ class TriageService:
         urgent_result = await db.execute(urgent_query)
         urgent_count = urgent_result.scalar() or 0
 
-        # 查询问题列表（按优先级和时间排序）
+        # 查询问题列表（按优先级和时间排序），只取渲染队列所需的列
         query = (
-            select(QALog)
+            select(*_PENDING_COLUMNS)
             .where(and_(*conditions))
             .order_by(QALog.is_urgent.desc(), QALog.priority.desc(), QALog.created_at.asc())
             .offset((page - 1) * page_size)
             .limit(page_size)
         )
         result = await db.execute(query)
-        logs = result.scalars().all()
 
         now = datetime.now()
-        questions = [
-            PendingQuestion(
-                log_id=log.log_id,
-                question=log.question,
-                user_id=log.user_id,
-                user_name=log.user_name,
-                detected_category=log.detected_category,
-                detected_difficulty=log.detected_difficulty or 2,
-                difficulty_label=DIFFICULTY_LABELS.get(log.detected_difficulty or 2, "L2 - 基础级"),
-                match_score=log.match_score,
-                priority=log.priority,
-                is_urgent=log.is_urgent,
-                triage_result=log.triage_result.value if log.triage_result else "pending",
-                created_at=log.created_at,
-                waiting_time_seconds=(now - log.created_at).total_seconds(),
-            )
-            for log in logs
-        ]
+        questions = _PENDING_LIST_ADAPTER.validate_python([
+            {
+                "log_id": row.log_id,
+                "question": row.question,
+                "user_id": row.user_id,
+                "user_name": row.user_name,
+                "detected_category": row.detected_category,
+                "detected_difficulty": row.detected_difficulty or 2,
+                "difficulty_label": DIFFICULTY_LABELS.get(row.detected_difficulty or 2, "L2 - 基础级"),
+                "match_score": row.match_score,
+                "priority": row.priority,
+                "is_urgent": row.is_urgent,
+                "triage_result": row.triage_result.value if row.triage_result else "pending",
+                "created_at": row.created_at,
+                "waiting_time_seconds": (now - row.created_at).total_seconds(),
+            }
+            for row in result.all()
+        ])
 
         return PendingQueueResponse(
             total=total,
@@ -0,0 +1,435 @@
+"""
+Tests for the assignment transfer service (teacher uploads and file manager sync).
+"""
+import asyncio
+import errno
+import io
+import os
+import shutil
+import zipfile
+
+import pytest
+
+from core.config import settings
+from schemas.assignment_transfer import BatchUploadRequest, FileManagerSyncRequest, TeacherAssignmentSubmit
+from services import assignment_transfer_service as transfer_module
+from services.assignment_transfer_service import AssignmentTransferService
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Service instance writing under a temporary directory."""
+    service = AssignmentTransferService()
+    service.upload_dir = str(tmp_path / "uploads" / "assignments")
+    service.file_manager_dir = str(tmp_path / "file_manager")
+    service.temp_dir = str(tmp_path / "temp")
+    return service
+
+
+class TestBatchUpload:
+    """Tests for batch_upload_student_submissions."""
+
+    @pytest.mark.asyncio
+    async def test_batch_upload_writes_valid_files(self, service):
+        """Valid submissions are written; invalid ones are counted as failures."""
+        request = BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": "s001", "file_content": "print('hi')", "file_name": "hi.py"},
+                {"student_id": "s002", "file_content": "你好", "file_name": "notes.txt"},
+                {"student_id": "s003", "file_content": "MZ", "file_name": "virus.exe"},
+            ],
+            sync_to_file_manager=False
+        )
+
+        result = await service.batch_upload_student_submissions(request)
+
+        assert result.total_files == 3
+        assert result.successfully_uploaded == 2
+        assert result.failed_uploads == 1
+        submissions_dir = os.path.join(service.upload_dir, "CS101", "hw001", "submissions")
+        with open(os.path.join(submissions_dir, "s002", "notes.txt"), encoding="utf-8") as f:
+            assert f.read() == "你好"
+        assert not os.path.exists(os.path.join(submissions_dir, "s003"))
+
+    @pytest.mark.asyncio
+    async def test_batch_abandoned_after_too_many_failures(self, service, monkeypatch):
+        """Validation stops and nothing is written once failures exceed the limit."""
+        monkeypatch.setattr(settings, "BATCH_UPLOAD_MAX_FAILURES", 1)
+        request = BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": "s001", "file_content": "print('hi')", "file_name": "hi.py"},
+                {"student_id": "s002", "file_content": "MZ", "file_name": "a.exe"},
+                {"student_id": "s003", "file_content": "MZ", "file_name": "b.exe"},
+                {"student_id": "s004", "file_content": "print('hi')", "file_name": "hi.py"},
+            ],
+            sync_to_file_manager=False
+        )
+
+        result = await service.batch_upload_student_submissions(request)
+
+        assert len(result.validation_results) == 3
+        assert result.successfully_uploaded == 0
+        assert result.failed_uploads == 4
+        assert not os.path.exists(service.upload_dir)
+
+    @pytest.mark.asyncio
+    async def test_background_sync_task_is_tracked(self, service):
+        """The file manager sync runs as a tracked task that is released when done."""
+        request = BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": "s001", "file_content": "print('hi')", "file_name": "hi.py"},
+            ],
+            sync_to_file_manager=True
+        )
+
+        await service.batch_upload_student_submissions(request)
+        assert len(service._bg_tasks) == 1
+        await asyncio.gather(*service._bg_tasks)
+        await asyncio.sleep(0)
+
+        assert not service._bg_tasks
+        synced = os.path.join(
+            service.file_manager_dir, "assignments", "CS101", "hw001", "submissions", "s001", "hi.py"
+        )
+        assert os.path.exists(synced)
+
+    @pytest.mark.asyncio
+    async def test_removed_directory_is_recreated(self, service):
+        """A directory deleted behind the cache's back is recreated on a later upload."""
+        request = BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": "s001", "file_content": "print('hi')", "file_name": "hi.py"},
+            ],
+            sync_to_file_manager=False
+        )
+        await service.batch_upload_student_submissions(request)
+        shutil.rmtree(service.upload_dir)
+
+        first = await service.batch_upload_student_submissions(request)
+        second = await service.batch_upload_student_submissions(request)
+
+        assert first.failed_uploads == 1
+        assert second.successfully_uploaded == 1
+
+
+class TestValidateFile:
+    """Tests for _validate_file."""
+
+    @pytest.mark.parametrize("filename,is_valid,language", [
+        ("Main.JAVA", True, "java"),
+        ("lib.c", True, "cpp"),
+        ("report.pdf", True, None),
+        ("archive.tar.gz", False, None),
+        ("Makefile", False, None),
+    ])
+    def test_extension_and_language(self, service, filename, is_valid, language):
+        """The extension is matched case-insensitively and mapped to a language."""
+        result = service._validate_file(filename, b"data")
+
+        assert result.is_valid is is_valid
+        assert result.detected_language == language
+
+    def test_oversized_file_is_rejected_first(self, service):
+        """The size check runs first and stops validation."""
+        result = service._validate_file("big.exe", b"x" * (10 * 1024 * 1024 + 1))
+
+        assert not result.is_valid
+        assert len(result.validation_errors) == 1
+        assert result.validation_errors[0].startswith("文件过大")
+
+
+class TestTeacherSubmit:
+    """Tests for submit_assignment_from_teacher."""
+
+    @pytest.mark.asyncio
+    async def test_attachment_is_written(self, service):
+        """The attachment bytes land under course/assignment."""
+        result = await service.submit_assignment_from_teacher(TeacherAssignmentSubmit(
+            assignment_id="hw001",
+            course_id="CS101",
+            title="Homework 1",
+            description="Warm-up",
+            due_date="2026-01-01T00:00:00",
+            file_attachment=b"%PDF-1.4",
+            file_name="spec.pdf"
+        ))
+
+        assert result["success"] is True
+        with open(os.path.join(service.upload_dir, "CS101", "hw001", "spec.pdf"), "rb") as f:
+            assert f.read() == b"%PDF-1.4"
+
+    @pytest.mark.asyncio
+    async def test_large_attachment_written_in_chunks(self, service):
+        """Attachments larger than one write chunk are written intact."""
+        payload = bytes(range(256)) * (10 * 1024)  # 2.5 MiB
+
+        await service.submit_assignment_from_teacher(TeacherAssignmentSubmit(
+            assignment_id="hw002",
+            course_id="CS101",
+            title="Homework 2",
+            description="Data files",
+            due_date="2026-01-01T00:00:00",
+            file_attachment=payload,
+            file_name="data.zip"
+        ))
+
+        with open(os.path.join(service.upload_dir, "CS101", "hw002", "data.zip"), "rb") as f:
+            assert f.read() == payload
+
+
+class TestSubmissionListing:
+    """Tests for get_assignment_submissions."""
+
+    @pytest.mark.asyncio
+    async def test_lists_submissions_with_preview(self, service):
+        """Each submitted file is listed with a truncated content preview."""
+        await service.batch_upload_student_submissions(BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": "s001", "file_content": "x = 1\n" * 50, "file_name": "main.py"},
+            ],
+            sync_to_file_manager=False
+        ))
+
+        submissions = await service.get_assignment_submissions("hw001", "CS101")
+
+        assert len(submissions) == 1
+        assert submissions[0]["student_id"] == "s001"
+        assert submissions[0]["status"] == "pending"
+        assert submissions[0]["content_preview"] == ("x = 1\n" * 50)[:100] + "..."
+
+    @pytest.mark.asyncio
+    async def test_pages_are_sorted_and_graded_files_detected(self, service):
+        """Students are paged in name order and a *_graded file marks the submission graded."""
+        await service.batch_upload_student_submissions(BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": sid, "file_content": "pass", "file_name": "main.py"}
+                for sid in ("s003", "s001", "s002")
+            ],
+            sync_to_file_manager=False
+        ))
+        student_dir = os.path.join(service.upload_dir, "CS101", "hw001", "submissions", "s002")
+        with open(os.path.join(student_dir, "main_graded.py"), "w", encoding="utf-8") as f:
+            f.write("# 90")
+
+        first_page = await service.get_assignment_submissions("hw001", "CS101", page=1, page_size=2)
+        second_page = await service.get_assignment_submissions("hw001", "CS101", page=2, page_size=2)
+
+        assert [s["student_id"] for s in second_page] == ["s003"]
+        graded = {s["file_name"]: s["status"] for s in first_page if s["student_id"] == "s002"}
+        assert graded["main.py"] == "graded"
+        assert [s["status"] for s in first_page if s["student_id"] == "s001"] == ["pending"]
+
+
+class TestFileManagerSync:
+    """Tests for the file manager full/incremental sync."""
+
+    @staticmethod
+    async def _upload(service, content="print('hi')"):
+        await service.batch_upload_student_submissions(BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": "s001", "file_content": content, "file_name": "hi.py"},
+            ],
+            sync_to_file_manager=False
+        ))
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync_skips_unchanged_files(self, service, monkeypatch):
+        """A repeat incremental sync skips the mtime comparison; modified sources are copied again."""
+        await self._upload(service)
+        request = FileManagerSyncRequest(
+            assignment_id="hw001", course_id="CS101", sync_type="incremental", target_path="out"
+        )
+        first = await service.sync_with_file_manager(request)
+        assert first.processed_files == 1
+
+        def no_target_stat(path):
+            raise AssertionError("target mtime should come from the sync cache")
+
+        monkeypatch.setattr(os.path, "getmtime", no_target_stat)
+        second = await service.sync_with_file_manager(request)
+        assert second.processed_files == 1
+        assert second.failed_files == 0
+        monkeypatch.undo()
+
+        source = os.path.join(service.upload_dir, "CS101", "hw001", "submissions", "s001", "hi.py")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("print('bye')")
+        stat = os.stat(source)
+        os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+        await service.sync_with_file_manager(request)
+
+        target = os.path.join(service.file_manager_dir, "out", "CS101", "hw001", "submissions", "s001", "hi.py")
+        with open(target, encoding="utf-8") as f:
+            assert f.read() == "print('bye')"
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync_restores_deleted_or_altered_target(self, service):
+        """A target deleted or rewritten outside the service is copied again on the next sync."""
+        await self._upload(service)
+        request = FileManagerSyncRequest(
+            assignment_id="hw001", course_id="CS101", sync_type="incremental", target_path="out"
+        )
+        await service.sync_with_file_manager(request)
+        target = os.path.join(service.file_manager_dir, "out", "CS101", "hw001", "submissions", "s001", "hi.py")
+
+        os.remove(target)
+        result = await service.sync_with_file_manager(request)
+        assert (result.processed_files, result.failed_files) == (1, 0)
+        with open(target, encoding="utf-8") as f:
+            assert f.read() == "print('hi')"
+
+        with open(target, "w", encoding="utf-8") as f:
+            f.write("tampered")
+        await service.sync_with_file_manager(request)
+        with open(target, encoding="utf-8") as f:
+            assert f.read() == "print('hi')"
+
+    @pytest.mark.asyncio
+    async def test_full_sync_copies_every_file(self, service):
+        """A full sync copies all submissions through the copy pool and counts them."""
+        await service.batch_upload_student_submissions(BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": f"s{i:03d}", "file_content": f"x = {i}", "file_name": "main.py"}
+                for i in range(20)
+            ],
+            sync_to_file_manager=False
+        ))
+
+        result = await service.sync_with_file_manager(FileManagerSyncRequest(
+            assignment_id="hw001", course_id="CS101", sync_type="full", target_path="out"
+        ))
+
+        assert (result.total_files, result.processed_files, result.failed_files) == (20, 20, 0)
+        target = os.path.join(service.file_manager_dir, "out", "CS101", "hw001", "submissions", "s007", "main.py")
+        with open(target, encoding="utf-8") as f:
+            assert f.read() == "x = 7"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sync_type", ["full", "incremental"])
+    async def test_sync_recreates_removed_target_directory(self, service, sync_type):
+        """A target tree deleted behind the directory cache's back is recreated."""
+        await self._upload(service)
+        full = FileManagerSyncRequest(
+            assignment_id="hw001", course_id="CS101", sync_type="full", target_path="out"
+        )
+        await service.sync_with_file_manager(full)
+        shutil.rmtree(service.file_manager_dir)
+
+        result = await service.sync_with_file_manager(full.model_copy(update={"sync_type": sync_type}))
+
+        assert (result.processed_files, result.failed_files) == (1, 0)
+        target = os.path.join(service.file_manager_dir, "out", "CS101", "hw001", "submissions", "s001", "hi.py")
+        assert os.path.exists(target)
+
+    @pytest.mark.parametrize("unsupported", [None, errno.EXDEV, errno.ENOTSOCK])
+    def test_fast_copy_preserves_content_and_mtime(self, tmp_path, monkeypatch, unsupported):
+        """_fast_copy matches copy2's content and mtime, falling back when the kernel copy is unsupported."""
+        if unsupported:
+            def no_kernel_copy(src_fd, dst_fd, offset, count):
+                raise OSError(unsupported, os.strerror(unsupported))
+            monkeypatch.setattr(transfer_module, "_KERNEL_COPIES", (no_kernel_copy,))
+        source = tmp_path / "src.bin"
+        payload = os.urandom(3 * 1024 * 1024 + 7)
+        source.write_bytes(payload)
+        os.utime(source, ns=(1_000_000_000_000_000_000, 1_500_000_000_123_456_789))
+        target = tmp_path / "dst.bin"
+        target.write_bytes(b"stale content that is longer than nothing")
+
+        transfer_module._fast_copy(str(source), str(target))
+
+        assert target.read_bytes() == payload
+        assert os.stat(target).st_mtime_ns == os.stat(source).st_mtime_ns
+
+
+class TestExportZip:
+    """Tests for export_assignment_zip."""
+
+    @pytest.mark.asyncio
+    async def test_export_streams_all_submissions(self, service):
+        """The streamed archive holds every submission, stored uncompressed."""
+        await service.batch_upload_student_submissions(BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": "s001", "file_content": "print(1)", "file_name": "a.py"},
+                {"student_id": "s002", "file_content": "作业" * 600000, "file_name": "essay.txt"},
+            ],
+            sync_to_file_manager=False
+        ))
+
+        chunks = [chunk async for chunk in service.export_assignment_zip("hw001", "CS101")]
+
+        assert len(chunks) > 2
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            assert zf.namelist() == ["s001/a.py", "s002/essay.txt"]
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist())
+            assert zf.read("s002/essay.txt").decode("utf-8") == "作业" * 600000
+
+    @pytest.mark.asyncio
+    async def test_export_clamps_pre_1980_mtimes(self, service):
+        """Files older than the ZIP epoch are exported with a 1980 timestamp."""
+        await service.batch_upload_student_submissions(BatchUploadRequest(
+            assignment_id="hw001",
+            course_id="CS101",
+            student_submissions=[
+                {"student_id": "s001", "file_content": "print(1)", "file_name": "a.py"},
+            ],
+            sync_to_file_manager=False
+        ))
+        old_file = os.path.join(service.upload_dir, "CS101", "hw001", "submissions", "s001", "a.py")
+        os.utime(old_file, (0, 0))
+
+        data = b"".join([chunk async for chunk in service.export_assignment_zip("hw001", "CS101")])
+
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.getinfo("s001/a.py").date_time[0] == 1980
+            assert zf.read("s001/a.py") == b"print(1)"
+
+    @pytest.mark.asyncio
+    async def test_export_of_unknown_assignment_is_empty_archive(self, service):
+        """An assignment without submissions exports a valid, empty archive."""
+        data = b"".join([chunk async for chunk in service.export_assignment_zip("nope", "CS101")])
+
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.namelist() == []
+
+
+class TestContentPreview:
+    """Tests for _get_content_preview."""
+
+    @pytest.mark.asyncio
+    async def test_preview_of_large_multibyte_file(self, service, tmp_path):
+        """Only the head is decoded; a multibyte character cut by the read limit is tolerated."""
+        path = tmp_path / "essay.txt"
+        path.write_text("作业" * 100000, encoding="utf-8")
+
+        preview = await service._get_content_preview(str(path), max_length=10)
+
+        assert preview == "作业" * 5 + "..."
+
+    @pytest.mark.asyncio
+    async def test_preview_of_short_and_binary_files(self, service, tmp_path):
+        """Short files are returned whole; non-UTF-8 files have no preview."""
+        short = tmp_path / "short.py"
+        short.write_text("print(1)", encoding="utf-8")
+        binary = tmp_path / "report.pdf"
+        binary.write_bytes(b"%PDF\xff\xfe\x00")
+
+        assert await service._get_content_preview(str(short)) == "print(1)"
+        assert await service._get_content_preview(str(binary)) == ""
@@ -101,3 +101,47 @@ def test_batch_grading(client):
     assert "results" in data
     assert len(data["results"]) == 2
 
+
+def test_export_submissions_with_non_latin1_ids(client):
+    """Test the export download name is RFC 5987 encoded for non-latin-1 ids."""
+    response = client.get(
+        "/api/v1/assignments/teacher/作业一/export",
+        params={"course_id": "计算机导论"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    disposition = response.headers["content-disposition"]
+    assert "filename*=UTF-8''%E8%AE%A1%E7%AE%97%E6%9C%BA" in disposition
+
+
+def test_batch_grading_requests_ai_feedback_concurrently(client, monkeypatch):
+    """Test batch grading asks for all AI feedback at once and survives one failure."""
+    from services.grading_service import grading_service
+
+    requested = []
+
+    async def fake_feedback_many(items):
+        requested.append([code for code, _ in items])
+        return ["Nice work.", RuntimeError("rate limited")]
+
+    monkeypatch.setattr(grading_service.ai, "generate_code_feedback_many", fake_feedback_many)
+    submissions = [
+        {
+            "student_id": f"student_00{i}",
+            "assignment_id": "hw_001",
+            "assignment_type": "code",
+            "content": f"def f{i}(a): return a + {i}"
+        }
+        for i in range(2)
+    ]
+    response = client.post("/api/v1/assignments/grade/batch", json={
+        "assignment_id": "hw_001",
+        "submissions": submissions
+    })
+
+    assert response.status_code == 200
+    assert requested == [[sub["content"] for sub in submissions]]
+    results = response.json()["results"]
+    assert [r["student_id"] for r in results] == ["student_000", "student_001"]
+    assert results[0]["code_feedback"]["ai_feedback"] == "Nice work."
+    assert results[1]["code_feedback"]["ai_feedback"] is None
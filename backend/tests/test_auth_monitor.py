@@ -0,0 +1,54 @@
+"""
+Tests for the authentication monitor service.
+"""
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from services.auth_monitor import AuthMonitorService
+
+
+@pytest.fixture
+def db():
+    """Session double recording add/commit/refresh calls."""
+    session = MagicMock()
+    session.commit = AsyncMock()
+    session.refresh = AsyncMock()
+    return session
+
+
+class TestLogAuthEvent:
+    """Tests for AuthMonitorService.log_auth_event."""
+
+    @pytest.mark.asyncio
+    async def test_success_event_rides_the_request_commit(self, db):
+        """Success events are only added; get_db commits them with the request."""
+        auth_log = await AuthMonitorService.log_auth_event(
+            db=db,
+            student_id="2024000001",
+            event_type="login",
+            status="success",
+            metadata={"device": "web", 1: "int key"}
+        )
+
+        db.add.assert_called_once_with(auth_log)
+        db.commit.assert_not_awaited()
+        db.refresh.assert_not_awaited()
+        assert json.loads(auth_log.extra_data) == {"device": "web", "1": "int key"}
+
+    @pytest.mark.asyncio
+    async def test_failure_event_is_committed_immediately(self, db):
+        """Failure events are committed before the caller raises and rolls back."""
+        auth_log = await AuthMonitorService.log_auth_event(
+            db=db,
+            student_id="2024000001",
+            event_type="login_failed",
+            status="failure",
+            failure_reason="密码错误"
+        )
+
+        db.add.assert_called_once_with(auth_log)
+        db.commit.assert_awaited_once()
+        db.refresh.assert_not_awaited()
+        assert auth_log.extra_data is None
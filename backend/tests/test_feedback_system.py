@@ -7,6 +7,7 @@ Tests cover:
 - Feedback templates CRUD
 - API endpoints
 """
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime
@@ -219,6 +220,550 @@ class TestAIService:
         assert stats is not None
         assert "total_interactions" in stats
 
+    def test_interaction_stats_track_evictions(self):
+        """Test running stats stay in sync with the bounded history."""
+        from services.ai_service import AIConfig, AIProvider, AIService
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        for i in range(150):
+            service._log_interaction("explain_code" if i < 60 else "answer_question", "p", "r", float(i))
+
+        stats = service.get_interaction_stats()
+        assert stats["total_interactions"] == 100
+        assert stats["by_type"] == {"answer_question": 90, "explain_code": 10}
+        assert stats["average_latency_ms"] == pytest.approx(sum(range(50, 150)) / 100)
+
+    @pytest.mark.asyncio
+    async def test_interactions_published_to_redis_stream(self):
+        """Test interactions are mirrored to the shared Redis stream and summarised from it."""
+        from services.ai_service import AIConfig, AIProvider, AIService
+
+        client = MagicMock()
+        client.xadd = AsyncMock()
+        client.xrevrange = AsyncMock(return_value=[
+            ("3-0", {"type": "explain_code", "latency_ms": "12.5"}),
+            ("2-0", {"type": "explain_code", "latency_ms": "40.0"}),
+            ("1-0", {"type": "answer_question", "latency_ms": "37.5"}),
+        ])
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        with patch("services.ai_service.cache_service.get_redis_client", AsyncMock(return_value=client)):
+            service._log_interaction("explain_code", "prompt", "response", 12.5)
+            await asyncio.gather(*service._publish_tasks)
+            stats = await service.get_shared_interaction_stats()
+
+        args, kwargs = client.xadd.await_args
+        assert args[0] == "ai:interactions"
+        assert args[1]["type"] == "explain_code"
+        assert kwargs == {"maxlen": 10000, "approximate": True}
+        client.xrevrange.assert_awaited_once_with("ai:interactions", count=100)
+        assert stats["total_interactions"] == 3
+        assert stats["average_latency_ms"] == 30.0
+        assert stats["by_type"] == {"explain_code": 2, "answer_question": 1}
+        assert stats["question_cache"] == service.question_cache_stats()
+        assert stats["response_cache"] == service.response_cache_stats()
+
+    @pytest.mark.asyncio
+    async def test_question_cache_reuses_repeated_questions(self):
+        """Test that the same question, up to case and spacing, is answered from the cache."""
+        from services.ai_service import AIConfig, AIProvider, AIService
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        service.provider = MagicMock()
+        service.provider.answer_question = AsyncMock(return_value={
+            "answer": "Recursion is when a function calls itself.",
+            "confidence": 0.85,
+            "needs_teacher_review": False,
+            "sources": []
+        })
+        service.provider.classify_question = AsyncMock(return_value="basic")
+
+        first = await service.answer_question("What is recursion in Python?")
+        second = await service.answer_question("  what is  RECURSION in python?")
+        await service.answer_question("How do I read a file line by line?")
+        assert second == first
+        assert service.provider.answer_question.await_count == 2
+
+        assert await service.categorize_question("What is a variable?") == "basic"
+        assert await service.categorize_question("What is a variable?") == "basic"
+        assert service.provider.classify_question.await_count == 1
+        assert service.question_cache_stats() == {
+            "answers": {"entries": 2, "hits": 1, "misses": 2},
+            "categories": {"entries": 1, "hits": 1, "misses": 1}
+        }
+
+    def test_question_cache_rejects_near_misses(self):
+        """Test that questions differing in a word or an operator never share a cached answer."""
+        from services.ai_service import QuestionCache
+
+        cache = QuestionCache()
+        cache.set("How do I reverse a list in Python?", "use lst.reverse()")
+        cache.set("What is the difference between a list and a tuple?", "tuples are immutable")
+
+        assert cache.get("How do I sort a list in Python?") is None
+        assert cache.get("What is the difference between a list and a set?") is None
+        assert cache.get("how do i REVERSE a list   in python?") == "use lst.reverse()"
+        assert cache.get("How do I reverse a list in Python?", "for a tuple") is None
+        assert cache.get("   ") is None
+
+        cache.set("What does xs[-1] return?", "the last element")
+        cache.set("Is `a == b` true here?", "yes")
+        assert cache.get("What does xs[1] return?") is None
+        assert cache.get("Is `a = b` true here?") is None
+
+    @pytest.mark.asyncio
+    async def test_generate_response_exact_cache(self):
+        """Test identical low-temperature requests are served from the response cache."""
+        from services.ai_service import AIConfig, AIProvider, AIService
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL, temperature=0.0))
+        service.provider.generate_response = AsyncMock(side_effect=[
+            "AI service error: timeout", '{"score": 90}', "other", "sampled", "sampled again"
+        ])
+
+        prompt = "Grade submission 7f3c exactly once"
+        assert (await service.generate_response(prompt, "rubric")).startswith("AI service error")
+        assert await service.generate_response(prompt, "rubric") == '{"score": 90}'
+        assert await service.generate_response(prompt, "rubric") == '{"score": 90}'
+        assert await service.generate_response(prompt, "rubric", temperature=0.2) == "other"
+        assert await service.generate_response(prompt, "rubric", temperature=0.7) == "sampled"
+        assert await service.generate_response(prompt, "rubric", temperature=0.7) == "sampled again"
+        assert service.provider.generate_response.await_count == 5
+        assert len(service._response_cache) == 2
+        assert service.response_cache_stats() == {"entries": 2, "hits": 1, "misses": 3}
+
+    @pytest.mark.asyncio
+    async def test_code_feedback_cached_with_provider_settings(self):
+        """Test feedback is cached at the grading temperature, keyed on the provider's own settings."""
+        from services.ai_service import AIConfig, AIProvider, AIService, FastChatProvider
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL, temperature=0.7))
+        service.provider = FastChatProvider(AIConfig(provider=AIProvider.FASTCHAT))
+        service.provider.generate_response = AsyncMock(side_effect=["变量命名清晰。", "缩进正确。", "r1", "r2"])
+
+        code, results = "x = 1", {"style_score": 90}
+        assert await service.generate_code_feedback(code, results) == "变量命名清晰。"
+        assert await service.generate_code_feedback(code, results) == "变量命名清晰。"
+        assert service.provider.generate_response.await_args.kwargs["temperature"] == service.GRADING_TEMPERATURE
+
+        # FastChat samples at FASTCHAT_TEMPERATURE, not the service's 0.7
+        with patch("services.ai_service.settings.FASTCHAT_TEMPERATURE", 0.1):
+            assert await service.generate_response("Grade report 12") == "缩进正确。"
+            assert await service.generate_response("Grade report 12") == "缩进正确。"
+        with patch("services.ai_service.settings.FASTCHAT_TEMPERATURE", 0.9):
+            assert await service.generate_response("Grade report 12") == "r1"
+            assert await service.generate_response("Grade report 12") == "r2"
+        assert service.provider.generate_response.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_generate_response_local_cache_is_bounded(self):
+        """Test the in-process response cache evicts the least recently used entry."""
+        from services.ai_service import AIConfig, AIProvider, AIService
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL, temperature=0.0))
+        service.RESPONSE_CACHE_MAX_ENTRIES = 2
+        service.provider.generate_response = AsyncMock(side_effect=lambda prompt, *_: f"re: {prompt}")
+
+        for prompt in ("a", "b", "a", "c", "a", "b"):
+            await service.generate_response(prompt)
+
+        assert len(service._response_cache) == 2
+        # "b" was evicted by "c" and had to be generated again
+        assert service.provider.generate_response.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_explain_code_section_requests(self):
+        """Test explain_code makes one call unless parallel sections are switched on."""
+        from services.ai_service import AIConfig, AIProvider, AIService
+
+        async def respond(prompt, system_prompt="", **kwargs):
+            if prompt.startswith("List the key programming concepts"):
+                assert kwargs["max_tokens"] == 200
+                return "1. Recursion\n2. Base case\n"
+            if prompt.startswith("In two or three sentences"):
+                return "AI service error: timeout"
+            assert "Key concepts" not in prompt
+            return "It computes a factorial."
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        service.provider.generate_response = AsyncMock(return_value="Key concept: recursion")
+        code = "def f(n): return 1 if n < 2 else n * f(n - 1)"
+
+        result = await service.explain_code(code)
+        assert service.provider.generate_response.await_count == 1
+        assert "Key concepts used in the code" in service.provider.generate_response.await_args.args[0]
+        assert result["key_concepts"] == ["Key concept: recursion"]
+
+        service.provider.generate_response = AsyncMock(side_effect=respond)
+        with patch("services.ai_service.settings.AI_EXPLAIN_PARALLEL_SECTIONS", True):
+            result = await service.explain_code(code)
+
+        assert service.provider.generate_response.await_count == 3
+        assert result["explanation"] == "It computes a factorial."
+        assert result["key_concepts"] == ["Recursion", "Base case"]
+        assert result["complexity_notes"] is None
+
+    @pytest.mark.asyncio
+    async def test_local_llm_bad_model_path_falls_back(self):
+        """Test a model that fails to load or generate degrades to the not-configured reply."""
+        from services.ai_service import AIConfig, AIProvider, LocalLLMProvider, settings
+
+        local = LocalLLMProvider(AIConfig(provider=AIProvider.LOCAL))
+        failing_llama = MagicMock(side_effect=ValueError("Model path does not exist: /missing.gguf"))
+        with patch("services.ai_service.Llama", failing_llama), \
+                patch.object(settings, "LOCAL_LLM_MODEL_PATH", "/missing.gguf"):
+            assert await local.generate_response("hi") == LocalLLMProvider._NOT_CONFIGURED
+            assert local.model is None
+
+            local.model = MagicMock()
+            local.model.create_chat_completion.side_effect = RuntimeError("llama_decode returned -1")
+            assert await local.generate_response("hi") == LocalLLMProvider._NOT_CONFIGURED
+
+    @pytest.mark.asyncio
+    async def test_response_parsing_helpers(self):
+        """Test the keyword and code block helpers."""
+        from services.ai_service import AIConfig, AIProvider, AIService, LocalLLMProvider, _zh_keyword_category
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        response = "Key Concepts:\n- The Observer Pattern\n```python\nprint(1)\n```\n```\nx = 2\n```"
+
+        assert service._extract_concepts(response) == ["Key Concepts:", "The Observer Pattern"]
+        assert service._extract_code_block(response) == "x = 2"
+        assert service._generate_follow_ups("Why does my FUNCTION raise an Error?") == [
+            "What would happen if we did it differently?",
+            "How can I prevent this issue in the future?",
+            "How can I test this function effectively?",
+        ]
+
+        local = LocalLLMProvider(AIConfig(provider=AIProvider.LOCAL))
+        assert await local.categorize_question("When is the Deadline?") == "administrative"
+        assert await local.categorize_question("What is a list?") == "basic"
+        assert await local.categorize_question("Explain closures") == "intermediate"
+        assert await local.categorize_question("What is good design?") == "advanced"
+        assert await local.categorize_question("What is the design deadline?") == "administrative"
+
+        answer = await local.answer_question("How do nested Loops work in a function?")
+        assert answer["answer"].startswith("Loops repeat code")
+        answer = await local.answer_question("What is a closure?")
+        assert answer["confidence"] == 0.3
+
+        assert _zh_keyword_category("作业截止时间是什么是？") == "basic"
+        assert _zh_keyword_category("如何查询成绩") == "administrative"
+        assert _zh_keyword_category("闭包怎么用") is None
+
+    @pytest.mark.asyncio
+    async def test_generate_code_feedback_many(self):
+        """Test batch feedback keeps input order and bounds concurrency."""
+        import asyncio
+
+        from services.ai_service import AIConfig, AIProvider, AIService
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        in_flight = peak = 0
+
+        async def fake_feedback(code, analysis_results):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if code == "boom":
+                raise RuntimeError("rate limited")
+            return f"feedback for {code}"
+
+        service.provider.generate_code_feedback = fake_feedback
+
+        items = [(f"code{i}", {}) for i in range(5)] + [("boom", {})]
+        results = await service.generate_code_feedback_many(items, max_concurrent=2)
+
+        assert results[:5] == [f"feedback for code{i}" for i in range(5)]
+        assert isinstance(results[5], RuntimeError)
+        assert peak <= 2
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_waits_for_refill(self):
+        """Test the token bucket delays callers once capacity is spent."""
+        import asyncio
+
+        from services.ai_service import TokenBucket
+
+        bucket = TokenBucket(capacity=2, period=0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await bucket.acquire()
+        await bucket.acquire()
+        assert loop.time() - start < 0.04
+        await bucket.acquire()
+        assert loop.time() - start >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_fastchat_caps_in_flight_requests(self):
+        """Test AI_MAX_CONCURRENT_REQUESTS bounds concurrent provider calls."""
+        from types import SimpleNamespace
+
+        from services.ai_service import AIConfig, AIProvider, FastChatProvider
+
+        in_flight = peak = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+        with patch("services.ai_service.settings.AI_MAX_CONCURRENT_REQUESTS", 2):
+            provider = FastChatProvider(AIConfig(provider=AIProvider.FASTCHAT))
+        provider.client = MagicMock()
+        provider.client.chat.completions.create = create
+
+        results = await asyncio.gather(*(provider.generate_response("hi") for _ in range(6)))
+
+        assert results == ["ok"] * 6
+        assert peak == 2
+
+    def test_openai_providers_share_client(self):
+        """Test providers for the same endpoint reuse one AsyncOpenAI client."""
+        from services.ai_service import AIConfig, OpenAIProvider
+
+        first = OpenAIProvider(AIConfig(api_key="shared-key"))
+        second = OpenAIProvider(AIConfig(api_key="shared-key"))
+        other = OpenAIProvider(AIConfig(api_key="other-key"))
+
+        assert first.client is second.client
+        assert other.client is not first.client
+
+    def test_http_client_without_aiohttp_keeps_pool_limits(self):
+        """Test the httpx fallback transport is not capped at the SDK default pool."""
+        from services.ai_service import HTTP_CONNECTION_LIMITS, _build_http_client
+
+        with patch("services.ai_service.DefaultAioHttpClient", None):
+            client = _build_http_client()
+
+        assert client._transport._pool._max_connections == HTTP_CONNECTION_LIMITS.max_connections
+
+    @pytest.mark.asyncio
+    async def test_openai_answer_confidence_from_logprobs(self):
+        """Test answer confidence is the mean token probability when logprobs are enabled."""
+        import math
+        from types import SimpleNamespace
+
+        from services.ai_service import AIConfig, OpenAIProvider
+
+        provider = OpenAIProvider(AIConfig(api_key="test-key"))
+        tokens = [SimpleNamespace(logprob=math.log(0.9)), SimpleNamespace(logprob=math.log(0.4))]
+        choice = SimpleNamespace(
+            message=SimpleNamespace(content="A list is mutable; a tuple might be faster."),
+            logprobs=SimpleNamespace(content=tokens)
+        )
+        provider.client = MagicMock()
+        provider.client.chat.completions.create = AsyncMock(
+            return_value=SimpleNamespace(choices=[choice], usage=None)
+        )
+
+        with patch("services.ai_service.settings.OPENAI_LOGPROBS", True):
+            result = await provider.answer_question("List vs tuple?")
+
+        assert provider.client.chat.completions.create.await_args.kwargs["logprobs"] is True
+        assert result["confidence"] == 0.6
+        assert result["needs_teacher_review"] is True
+
+        # Off by default; an endpoint that omits logprobs gets the length heuristic
+        choice.logprobs = None
+        result = await provider.answer_question("List vs tuple?")
+
+        assert "logprobs" not in provider.client.chat.completions.create.await_args.kwargs
+        assert result["confidence"] == 0.6
+        with patch("services.ai_service.settings.OPENAI_LOGPROBS", True):
+            choice.message.content = "x" * 101
+            assert (await provider.answer_question("List vs tuple?"))["confidence"] == 0.85
+
+    @pytest.mark.asyncio
+    async def test_openai_error_handling(self):
+        """Test API errors become an error string while other exceptions propagate."""
+        import httpx
+        import openai
+
+        from services.ai_service import AIConfig, OpenAIProvider
+
+        with patch("services.ai_service.settings.OPENAI_API_KEY", None):
+            disabled = OpenAIProvider(AIConfig(api_key=None))
+        assert await disabled.generate_response("hi") == "AI service not configured. Set OPENAI_API_KEY."
+
+        provider = OpenAIProvider(AIConfig(api_key="test-key"))
+        provider.client = MagicMock()
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        provider.client.chat.completions.create = AsyncMock(
+            side_effect=openai.APIConnectionError(request=request)
+        )
+        assert (await provider.generate_response("hi")).startswith("AI service error")
+
+        provider.client.chat.completions.create = AsyncMock(side_effect=asyncio.CancelledError())
+        with pytest.raises(asyncio.CancelledError):
+            await provider.generate_response("hi")
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_fails_fast(self):
+        """Test the breaker opens after repeated outages and recovers via one probe."""
+        import httpx
+        import openai
+
+        from services.ai_service import AIConfig, OpenAIProvider
+
+        provider = OpenAIProvider(AIConfig(api_key="test-key"))
+        provider.client = MagicMock()
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        provider.client.chat.completions.create = AsyncMock(
+            side_effect=openai.APIConnectionError(request=request)
+        )
+
+        for _ in range(provider.breaker.failure_threshold):
+            await provider.generate_response("hi")
+        assert provider.breaker.state == "open"
+        assert (await provider.generate_response("hi")).startswith("AI service error")
+        assert provider.client.chat.completions.create.await_count == provider.breaker.failure_threshold
+
+        provider.breaker.opened_at -= provider.breaker.recovery_timeout
+        assert provider.breaker.state == "half_open"
+        message = MagicMock(content="back up")
+        provider.client.chat.completions.create = AsyncMock(
+            return_value=MagicMock(choices=[MagicMock(message=message)], usage=None)
+        )
+        assert await provider.generate_response("hi") == "back up"
+        assert provider.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_provider_error_answers_are_not_cached(self):
+        """Test an outage reply is flagged as an error and asked again next time."""
+        from services.ai_service import AIConfig, AIProvider, AIService, FastChatProvider
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        service.provider = FastChatProvider(AIConfig(provider=AIProvider.FASTCHAT))
+        service.provider.generate_response = AsyncMock(side_effect=[
+            "FastChat服务错误: Connection refused", "变量是存储数据的命名位置。"
+        ])
+
+        failed = await service.answer_question("什么是变量？")
+        assert failed["error"] is True
+        assert failed["confidence"] == 0.0
+        assert failed["needs_teacher_review"] is True
+
+        answered = await service.answer_question("什么是变量？")
+        assert answered["error"] is False
+        assert answered["answer"] == "变量是存储数据的命名位置。"
+        assert await service.answer_question("什么是变量？") == answered
+        assert service.provider.generate_response.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_categorize_question_keyword_short_circuit(self):
+        """Test keyword matches skip the model; other questions still ask it."""
+        from services.ai_service import AIConfig, AIProvider, FastChatProvider, OpenAIProvider
+
+        fastchat = FastChatProvider(AIConfig(provider=AIProvider.FASTCHAT))
+        fastchat.generate_response = AsyncMock(return_value="advanced")
+        assert await fastchat.categorize_question("作业什么时候截止？") == "administrative"
+        fastchat.generate_response.assert_not_awaited()
+        assert await fastchat.categorize_question("闭包怎么用？") == "advanced"
+
+        openai_provider = OpenAIProvider(AIConfig(api_key="test-key"))
+        openai_provider.generate_response = AsyncMock(return_value="nonsense")
+        assert await openai_provider.categorize_question("How do I optimize this loop?") == "advanced"
+        openai_provider.generate_response.assert_not_awaited()
+        assert await openai_provider.categorize_question("Explain closures") == "intermediate"
+        openai_provider.generate_response.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_categorize_race_skips_failed_providers(self):
+        """Test a provider that failed fast never wins the race or fills the cache."""
+        from services.ai_service import AIConfig, AIProvider, AIService
+
+        cancelled = asyncio.Event()
+
+        async def failed(question):
+            return None
+
+        async def stalled(question):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def slow_label(question):
+            await asyncio.sleep(0.01)
+            return "advanced"
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        service.provider = MagicMock(classify_question=failed)
+        service._race_rivals = [MagicMock(classify_question=slow_label), MagicMock(classify_question=stalled)]
+        assert await service.categorize_question("Explain closures") == "advanced"
+        assert service.question_cache_stats()["categories"]["entries"] == 1
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+
+        service._race_rivals = [MagicMock(classify_question=failed)]
+        assert await service.categorize_question("Explain decorators") == "intermediate"
+        assert service.question_cache_stats()["categories"]["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_chinese_code_feedback_prompt(self):
+        """Test FastChat feedback uses the shared prompt template verbatim."""
+        from services.ai_service import AIConfig, AIProvider, FastChatProvider
+
+        provider = FastChatProvider(AIConfig(provider=AIProvider.FASTCHAT))
+        provider.generate_response = AsyncMock(return_value="好")
+        code = "d = {'a': 1}\nprint(f'{d}')"
+
+        await provider.generate_code_feedback(code, {"style_score": 80, "issues": ["缺少注释"]})
+
+        prompt, system_prompt = provider.generate_response.await_args.args
+        assert f"```python\n{code}\n```" in prompt
+        assert "- 代码风格评分: 80\n- 复杂度: N/A\n- 发现的问题:\n- 缺少注释\n" in prompt
+        assert system_prompt.startswith("你是一位经验丰富的编程教学助手")
+        assert not hasattr(AIConfig(), "__dict__")
+
+    def test_system_prompts_are_request_independent(self):
+        """Test request data stays out of system prompts so the prefix is cacheable."""
+        from services.ai_service import AIService
+
+        first = AIService._explain_code_prompts("x = 1", "python", "brief", "beginner")
+        second = AIService._explain_code_prompts("let x = 1", "javascript", "detailed", "advanced")
+        assert first[0] == second[0]
+        assert "javascript" in second[1] and "advanced" in second[1]
+
+        first = AIService._suggest_improvements_prompts("x = 1", "python", None, 3, False)
+        second = AIService._suggest_improvements_prompts("x = 1", "go", ["performance"], 5, True)
+        assert first[0] == second[0]
+        assert "Focus on: performance" in second[1]
+
+    @pytest.mark.asyncio
+    async def test_fastchat_answer_question_stream(self):
+        """Test FastChat streams answer deltas as they arrive."""
+        from types import SimpleNamespace
+
+        from services.ai_service import AIConfig, AIProvider, AIService, FastChatProvider
+
+        async def fake_stream():
+            for text in ["变量", None, "是名字"]:
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+        provider = FastChatProvider(AIConfig(provider=AIProvider.FASTCHAT))
+        provider.client = MagicMock()
+        provider.client.chat.completions.create = AsyncMock(return_value=fake_stream())
+
+        chunks = [chunk async for chunk in provider.answer_question_stream("什么是变量？")]
+
+        assert chunks == ["变量", "是名字"]
+        assert provider.client.chat.completions.create.await_args.kwargs["stream"] is True
+
+        service = AIService(AIConfig(provider=AIProvider.LOCAL))
+        service.provider = provider
+        provider.client.chat.completions.create = AsyncMock(return_value=fake_stream())
+        chunks = [chunk async for chunk in service.answer_student_question_stream("什么是变量？")]
+        assert "".join(chunks) == "变量是名字"
+        assert service.get_interaction_stats()["by_type"] == {"answer_question": 1}
+
 
 class TestFeedbackTemplates:
     """Tests for Feedback Templates."""
@@ -256,6 +801,20 @@ class TestFeedbackTemplates:
         assert FeedbackCategory.SECURITY.value == "security"
         assert FeedbackCategory.SUGGESTIONS.value == "suggestions"
 
+    def test_template_render(self):
+        """Test rendering substitutes known placeholders and keeps unknown ones."""
+        from models.feedback_template import FeedbackTemplate
+
+        template = FeedbackTemplate(
+            title="Function {function_name}",
+            message="'{function_name}' has {line_count} lines; see {docs_url}.",
+        )
+
+        title, message = template.render(function_name="solve", line_count=42)
+
+        assert title == "Function solve"
+        assert message == "'solve' has 42 lines; see {docs_url}."
+
 
 class TestFeedbackAPIEndpoints:
     """Tests for Feedback API endpoints."""
@@ -264,6 +823,7 @@ class TestFeedbackAPIEndpoints:
     def client(self):
         """Create test client."""
         from fastapi.testclient import TestClient
+
         from app.main import app
         return TestClient(app)
 
@@ -293,6 +853,25 @@ class TestFeedbackAPIEndpoints:
 
         assert response.status_code in [200, 500]
 
+    def test_explain_code_stream_endpoint(self, client):
+        """Test POST /api/v1/ai/explain-code-stream endpoint."""
+        async def fake_stream(*args, **kwargs):
+            for chunk in ["This loop ", "prints 0-9."]:
+                yield chunk
+
+        with patch("api.ai.ai_service.explain_code_stream", fake_stream):
+            response = client.post(
+                "/api/v1/ai/explain-code-stream",
+                json={"code": "for i in range(10): print(i)", "language": "python"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line for line in response.text.splitlines() if line.startswith("data: ")]
+        assert events[0] == 'data: {"type": "start"}'
+        assert '"content": "This loop "' in events[1]
+        assert events[-1] == 'data: {"type": "done"}'
+
     def test_suggest_improvements_endpoint(self, client):
         """Test POST /api/v1/ai/suggest-improvements endpoint."""
         response = client.post(
@@ -342,6 +921,7 @@ class TestFeedbackTemplatesAPI:
     def client(self):
         """Create test client."""
         from fastapi.testclient import TestClient
+
         from app.main import app
         return TestClient(app)
 
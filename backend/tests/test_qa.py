@@ -98,3 +98,21 @@ def test_answer_question_allows_admin(client):
     finally:
         client.app.dependency_overrides.pop(get_current_teacher_or_admin, None)
 
+
+@pytest.mark.parametrize(
+    "difficulty, match_score, expected",
+    [
+        (1, 0.9, 0),
+        (2, 0.4, 1),
+        (3, 0.6, 1),
+        (3, 0.4, 2),
+        (4, 0.9, 2),
+        (2, 0.1, 2),
+        (5, 0.1, 4),
+    ],
+)
+def test_calculate_priority(difficulty, match_score, expected):
+    """优先级随难度升高、匹配度降低而递增。"""
+    from services.qa_engine_service import qa_engine_service
+
+    assert qa_engine_service._calculate_priority(difficulty, match_score) == expected
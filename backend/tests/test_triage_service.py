@@ -0,0 +1,80 @@
+"""
+Tests for the triage service pending queue.
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.qa_log import QALog, TriageResult
+from services.triage_service import triage_service
+from tests.test_utils import (
+    clear_test_db_state,
+    dispose_test_db,
+    init_test_db,
+    reset_test_db_sync,
+)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def setup_db():
+    """每个测试前初始化内存数据库，测试后销毁"""
+    clear_test_db_state()
+    reset_test_db_sync()
+    await init_test_db()
+    yield
+    await dispose_test_db()
+
+
+@pytest_asyncio.fixture
+async def db_session():
+    """获取一个异步数据库会话"""
+    from tests.test_utils import _test_sessionmaker
+    async with _test_sessionmaker() as session:
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_pending_queue_orders_urgent_first_and_fills_defaults(db_session):
+    """Test urgent rows lead the queue and unset columns fall back to defaults."""
+    now = datetime.now()
+    db_session.add_all([
+        QALog(
+            log_id="log-default",
+            question="What is a list comprehension?",
+            created_at=now - timedelta(minutes=10),
+        ),
+        QALog(
+            log_id="log-urgent",
+            question="My program crashes before the deadline",
+            user_id="student_001",
+            detected_difficulty=4,
+            triage_result=TriageResult.TO_TEACHER,
+            priority=5,
+            is_urgent=True,
+            created_at=now - timedelta(minutes=1),
+        ),
+    ])
+    await db_session.commit()
+
+    response = await triage_service.get_pending_queue(db_session)
+
+    assert response.total == 2
+    assert response.urgent_count == 1
+    urgent, default = response.questions
+    assert [urgent.log_id, default.log_id] == ["log-urgent", "log-default"]
+
+    assert urgent.triage_result == "to_teacher"
+    assert urgent.difficulty_label == "L4 - 高级"
+    assert urgent.is_urgent is True
+    assert 60 <= urgent.waiting_time_seconds < 600
+
+    assert default.triage_result == "pending"
+    assert default.detected_difficulty == 2
+    assert default.difficulty_label == "L2 - 基础级"
+    assert default.is_urgent is False
+    assert default.waiting_time_seconds >= 600